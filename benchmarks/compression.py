@@ -0,0 +1,44 @@
+"""Size and CPU cost of compressing blog post content.
+
+Usage: python -m benchmarks.compression --sizes 4 16 64 256 --level 6
+
+Reports compression ratio and per-post compress/decompress time for the
+codec used by src.services.compression.
+"""
+
+# Standard library imports
+import argparse
+import random
+import time
+import zlib
+
+from benchmarks.revisions import make_post
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 16, 64, 256])
+    parser.add_argument("--level", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'size KB':>8} {'ratio':>6} {'compress ms':>12} {'decompress ms':>14}")
+    for size_kb in args.sizes:
+        data = make_post(size_kb, rng).encode()
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            blob = zlib.compress(data, args.level)
+        compress_ms = (time.perf_counter() - start) * 1000 / args.repeat
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            zlib.decompress(blob)
+        decompress_ms = (time.perf_counter() - start) * 1000 / args.repeat
+        ratio = len(data) / len(blob)
+        print(f"{size_kb:>8} {ratio:>6.2f} {compress_ms:>12.3f} {decompress_ms:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""Micro-benchmarks for per-request auth and model primitives.
+
+Usage:
+    python -m benchmarks.hot_paths                     # run, record, compare
+    python -m benchmarks.hot_paths --update-baseline   # accept current numbers
+
+Every run is appended to benchmarks/results/hot_paths.jsonl together with
+the git commit and pydantic/PyJWT versions, so trends survive upgrades.
+Benchmarks are interleaved over --rounds rounds and each result is the
+median across rounds; the noise column is the median absolute deviation of
+the rounds relative to that median. The run exits non-zero when a benchmark
+is slower than its baseline by more than --threshold, or has no baseline, so
+it can gate CI.
+Between runs on a shared development machine these medians moved by up to
+12%, and by 40% under concurrent load, so the default is 50%; a run whose
+noise exceeds the threshold says so.
+
+The committed baseline in benchmarks/baselines/hot_paths.json was recorded
+on a development machine; timings are only comparable on the same hardware,
+so refresh it with --update-baseline where the gate runs.
+"""
+
+# Standard library imports
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+# Importing src.core.config needs these; the benchmarks never touch the database.
+for name, value in {
+    "SECRET_KEY": "benchmark-secret",
+    "POSTGRES_USERNAME": "benchmark",
+    "POSTGRES_PASSWORD": "benchmark",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_DB": "benchmark",
+}.items():
+    os.environ.setdefault(name, value)
+
+# Third party imports
+import jwt
+import pydantic
+from pydantic import parse_obj_as
+
+from src.core.config import SECRET_KEY, TOKEN_TYPE
+from src.models.blog_post import BlogPostPublic
+from src.models.token import AccessToken, JWTCred, JWTMeta, JWTPayload
+from src.models.users import UserInDB, UserPrincipal, UserPublic
+from src.services.auth import AuthService
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESULTS_PATH = os.path.join(HERE, "results", "hot_paths.jsonl")
+BASELINE_PATH = os.path.join(HERE, "baselines", "hot_paths.json")
+
+auth_service = AuthService()
+
+USER_ROW = {
+    "uuid": "6f1c1c3e-8a52-4d8e-9d43-2b1d6c0f9a11",
+    "email": "ada@example.com",
+    "first_name": "Ada",
+    "last_name": "Lovelace",
+    "username": "ada",
+    "password": "$2b$12$abcdefghijklmnopqrstuuSOMEHASHEDPASSWORDVALUE12345678",
+    "salt": "",
+    "created_at": datetime(2023, 1, 1, tzinfo=timezone.utc),
+    "updated_at": datetime(2023, 1, 1, tzinfo=timezone.utc),
+}
+PRINCIPAL = UserPrincipal(**USER_ROW)
+TOKEN = auth_service.create_access_token_for_user(user=PRINCIPAL)
+BLOG_POST_ROWS = [
+    {
+        "post_id": i,
+        "title": f"Post {i}",
+        "content": "lorem ipsum " * 100,
+        "user_uuid": USER_ROW["uuid"],
+        "user_username": "ada",
+        "created_at": datetime(2023, 1, 1, tzinfo=timezone.utc),
+        "updated_at": datetime(2023, 1, 1, tzinfo=timezone.utc),
+        "tags": ["python", "api"],
+    }
+    for i in range(100)
+]
+
+
+def register_round_trip() -> UserPublic:
+    """Model work in the users router around register_new_user."""
+    created_user = UserPublic(**UserInDB(**USER_ROW).dict())
+    access_token = AccessToken(
+        access_token=auth_service.create_access_token_for_user(user=created_user),
+        token_type=TOKEN_TYPE,
+    )
+    return created_user.copy(update={"access_token": access_token})
+
+
+def jwt_payload() -> JWTPayload:
+    """Payload construction done for every issued token."""
+    return JWTPayload(
+        **JWTMeta().dict(), **JWTCred(email=USER_ROW["email"], username="ada").dict()
+    )
+
+
+BENCHMARKS: Dict[str, Callable[[], object]] = {
+    "create_access_token_for_user": lambda: auth_service.create_access_token_for_user(
+        user=PRINCIPAL
+    ),
+    "get_data_from_token": lambda: auth_service.get_data_from_token(
+        token=TOKEN, secret_key=str(SECRET_KEY)
+    ),
+    "jwt_payload": jwt_payload,
+    "user_public": lambda: UserPublic(**USER_ROW),
+    "user_principal": lambda: UserPrincipal(**USER_ROW),
+    "register_round_trip": register_round_trip,
+    "blog_post_public_list_100": lambda: parse_obj_as(
+        List[BlogPostPublic], BLOG_POST_ROWS
+    ),
+}
+
+
+def calls_per_run(func: Callable[[], object], min_time: float) -> int:
+    """Calls per timed run so that one run takes about min_time seconds."""
+    number, elapsed = timeit.Timer(func).autorange()
+    return max(number, int(number * min_time / elapsed))
+
+
+def measure(func: Callable[[], object], number: int, repeat: int) -> float:
+    """Median microseconds per call over repeat timed runs."""
+    runs = timeit.Timer(func).repeat(repeat=repeat, number=number)
+    return statistics.median(runs) / number * 1e6
+
+
+def git_commit() -> str:
+    """Current commit, or "unknown" outside a checkout."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=HERE, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def main() -> None:
+    """Run, record and compare the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.1)
+    parser.add_argument("--threshold", type=float, default=0.50)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--only", nargs="*", default=None)
+    args = parser.parse_args()
+
+    selected = {
+        name: func
+        for name, func in BENCHMARKS.items()
+        if not args.only or name in args.only
+    }
+    numbers = {name: calls_per_run(func, args.min_time) for name, func in selected.items()}
+    # Interleaved rounds spread slow phases of the machine over all benchmarks.
+    samples: Dict[str, List[float]] = {name: [] for name in selected}
+    for _ in range(args.rounds):
+        for name, func in selected.items():
+            samples[name].append(measure(func, numbers[name], args.repeat))
+    results = {name: statistics.median(values) for name, values in samples.items()}
+    noise = {
+        name: statistics.median(abs(value - results[name]) for value in values)
+        / results[name]
+        for name, values in samples.items()
+    }
+
+    run = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pydantic": pydantic.VERSION,
+        "pyjwt": jwt.__version__,
+        "results_us": results,
+        "noise": noise,
+    }
+    os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+    with open(RESULTS_PATH, "a") as f:
+        f.write(json.dumps(run) + "\n")
+
+    baseline: Dict[str, float] = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)["results_us"]
+
+    regressions = []
+    missing = []
+    print(
+        f"{'benchmark':<32} {'us/call':>10} {'baseline':>10} {'change':>8} {'noise':>7}"
+    )
+    for name, value in results.items():
+        base = baseline.get(name)
+        change = f"{(value / base - 1) * 100:+.1f}%" if base else "-"
+        print(
+            f"{name:<32} {value:>10.2f} {base or 0:>10.2f} {change:>8} "
+            f"{noise[name]:>7.0%}"
+        )
+        if not base:
+            missing.append(name)
+        elif value > base * (1 + args.threshold):
+            regressions.append(name)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, "w") as f:
+            # Benchmarks left out with --only keep their baseline.
+            json.dump({**run, "results_us": {**baseline, **results}}, f, indent=2)
+        print(f"Baseline updated: {BASELINE_PATH}")
+        return
+    noisy = [name for name, spread in noise.items() if spread > args.threshold]
+    if noisy:
+        print(
+            f"Noise above the {args.threshold:.0%} threshold for: {', '.join(noisy)}; "
+            "rerun on a quieter machine or raise --threshold"
+        )
+    if missing:
+        print(f"No baseline for: {', '.join(missing)}; run with --update-baseline")
+    if regressions:
+        print(f"Regressed beyond {args.threshold:.0%}: {', '.join(regressions)}")
+    if missing or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
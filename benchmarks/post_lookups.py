@@ -0,0 +1,183 @@
+"""Latency of blog_post lookups by post_id, for comparing partitioned tables.
+
+Usage: python -m benchmarks.post_lookups --dsn postgresql://... --runs 500
+
+Run it before and after the blog_post partitioning migration on the same
+seeded data. Partitions are on created_at, and these paths filter on
+post_id only, so every monthly partition's index is probed; the partitions
+column counts the blog_post relations each plan touched. Update and delete
+run in transactions that are rolled back. The feed path needs a user who
+follows someone and is skipped otherwise.
+"""
+
+# Standard library imports
+import argparse
+import asyncio
+import os
+import random
+import re
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+# Importing src.core.config needs these; the dsn comes from the command line.
+for name, value in {
+    "SECRET_KEY": "benchmark-secret",
+    "POSTGRES_USERNAME": "benchmark",
+    "POSTGRES_PASSWORD": "benchmark",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_DB": "benchmark",
+}.items():
+    os.environ.setdefault(name, value)
+
+# Third party imports
+import asyncpg
+
+from src.core.config import FANOUT_MAX_FOLLOWERS
+from src.db.prepared import PreparedQuery
+from src.db.repositories.blog_post import (
+    DELETE_BLOG_POST_BY_POST_ID_QUERY,
+    GET_BLOG_POST_BY_POST_ID_QUERY,
+    GET_BLOG_POSTS_BY_TAG_QUERY,
+    GET_FEED_QUERY,
+    LOCK_BLOG_POST_FOR_UPDATE_QUERY,
+    MAX_POST_ID,
+    UPDATE_BLOG_POST_BY_POST_ID_QUERY,
+)
+
+SAMPLE_POST_IDS_QUERY = """
+    SELECT post_id FROM blog_post TABLESAMPLE SYSTEM (1) LIMIT 1000;
+"""
+
+SAMPLE_TAG_NAMES_QUERY = """
+    SELECT name FROM tag ORDER BY tag_id LIMIT 20;
+"""
+
+GET_FOLLOWER_QUERY = """
+    SELECT follower_uuid FROM follow LIMIT 1;
+"""
+
+COUNT_PARTITIONS_QUERY = """
+    SELECT count(*) FROM pg_inherits WHERE inhparent = to_regclass('blog_post');
+"""
+
+# Relations named in EXPLAIN output: blog_post or one of its partitions.
+BLOG_POST_RELATION = re.compile(r" on (blog_post(?:_\w+)?)\b")
+
+
+async def time_path(
+    connection: asyncpg.Connection,
+    query: str,
+    values: List[Dict[str, Any]],
+    rollback: bool,
+) -> Dict[str, float]:
+    """p50/p95 latency in ms over values, plus partitions touched by one plan."""
+    prepared = PreparedQuery(query)
+    samples = []
+    for value in values:
+        start = time.perf_counter()
+        if rollback:
+            transaction = connection.transaction()
+            await transaction.start()
+            await connection.fetch(prepared.sql, *prepared.args(value))
+            await transaction.rollback()
+        else:
+            await connection.fetch(prepared.sql, *prepared.args(value))
+        samples.append((time.perf_counter() - start) * 1000)
+    transaction = connection.transaction()
+    await transaction.start()
+    plan = await connection.fetch(
+        "EXPLAIN (ANALYZE, COSTS OFF) " + prepared.sql, *prepared.args(values[0])
+    )
+    await transaction.rollback()
+    relations = {
+        match
+        for row in plan
+        for match in BLOG_POST_RELATION.findall(row[0])
+        if not match.endswith(("_pkey", "_idx"))
+    }
+    return {
+        "p50": statistics.median(samples),
+        "p95": statistics.quantiles(samples, n=20)[-1],
+        "partitions": len(relations),
+    }
+
+
+async def run(dsn: str, runs: int, seed: int) -> None:
+    """Time each lookup path on random existing posts."""
+    rng = random.Random(seed)
+    connection = await asyncpg.connect(dsn)
+    try:
+        post_ids = [row[0] for row in await connection.fetch(SAMPLE_POST_IDS_QUERY)]
+        if not post_ids:
+            raise SystemExit("blog_post is empty; seed it first")
+        tags = [row[0] for row in await connection.fetch(SAMPLE_TAG_NAMES_QUERY)]
+        follower: Optional[str] = await connection.fetchval(GET_FOLLOWER_QUERY)
+        partitions = await connection.fetchval(COUNT_PARTITIONS_QUERY)
+        print(f"blog_post partitions: {partitions}")
+
+        def by_post_id() -> List[Dict[str, Any]]:
+            return [{"post_id": rng.choice(post_ids)} for _ in range(runs)]
+
+        paths = {
+            "get by post_id": (GET_BLOG_POST_BY_POST_ID_QUERY, by_post_id(), False),
+            "lock for update": (LOCK_BLOG_POST_FOR_UPDATE_QUERY, by_post_id(), True),
+            "update": (
+                UPDATE_BLOG_POST_BY_POST_ID_QUERY,
+                [
+                    {**value, "title": "t", "content": "c", "content_compressed": None}
+                    for value in by_post_id()
+                ],
+                True,
+            ),
+            "delete": (DELETE_BLOG_POST_BY_POST_ID_QUERY, by_post_id(), True),
+        }
+        if tags:
+            paths["by tag"] = (
+                GET_BLOG_POSTS_BY_TAG_QUERY,
+                [
+                    {"tag": rng.choice(tags), "before": MAX_POST_ID, "limit": 20}
+                    for _ in range(runs)
+                ],
+                False,
+            )
+        if follower:
+            paths["feed"] = (
+                GET_FEED_QUERY,
+                [
+                    {
+                        "user_uuid": follower,
+                        "before": MAX_POST_ID,
+                        "limit": 20,
+                        "max_followers": FANOUT_MAX_FOLLOWERS,
+                    }
+                ]
+                * runs,
+                False,
+            )
+
+        print(f"{'path':<16} {'p50 ms':>8} {'p95 ms':>8} {'partitions':>10}")
+        for name, (query, values, rollback) in paths.items():
+            result = await time_path(connection, query, values, rollback)
+            print(
+                f"{name:<16} {result['p50']:>8.3f} {result['p95']:>8.3f} "
+                f"{result['partitions']:>10}"
+            )
+    finally:
+        await connection.close()
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("--dsn or DATABASE_URL is required")
+    asyncio.run(run(args.dsn, args.runs, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Round-trip latency and CPU of hot queries: databases vs prepared statements.
+
+Usage: python -m benchmarks.prepared_queries --dsn postgresql://... --runs 2000
+
+Needs at least one user and one blog post. Each query runs through the
+databases library as the repositories did before, then through the
+PreparedQuery fast path. CPU is the client process time per call, which is
+what the fast path saves; latency also includes the server round trip.
+Inserts run in a transaction that is rolled back.
+"""
+
+# Standard library imports
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+# Importing src.core.config needs these; the dsn comes from the command line.
+for name, value in {
+    "SECRET_KEY": "benchmark-secret",
+    "POSTGRES_USERNAME": "benchmark",
+    "POSTGRES_PASSWORD": "benchmark",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_DB": "benchmark",
+}.items():
+    os.environ.setdefault(name, value)
+
+# Third party imports
+from databases import Database
+
+from src.db.prepared import PreparedQuery, fetch_one_prepared
+from src.db.repositories.blog_post import (
+    CREATE_BLOG_POST_QUERY,
+    GET_BLOG_POST_BY_POST_ID_QUERY,
+)
+from src.db.repositories.users import GET_USER_BY_USERNAME_QUERY
+
+
+async def measure(call: Callable[[], Awaitable[Any]], runs: int) -> Dict[str, float]:
+    """p50/p95 latency in ms and mean client CPU in us per call."""
+    for _ in range(min(runs, 50)):
+        await call()
+    latencies: List[float] = []
+    cpu_start = time.process_time()
+    for _ in range(runs):
+        start = time.perf_counter()
+        await call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    cpu = (time.process_time() - cpu_start) / runs * 1e6
+    return {
+        "p50": statistics.median(latencies),
+        "p95": statistics.quantiles(latencies, n=20)[-1],
+        "cpu": cpu,
+    }
+
+
+async def run(dsn: str, runs: int) -> None:
+    """Compare both paths for each hot query."""
+    # One connection, so both paths hit the same warm statement cache.
+    database = Database(dsn, min_size=1, max_size=1)
+    await database.connect()
+    try:
+        user = await database.fetch_one("SELECT uuid, username FROM users LIMIT 1")
+        post_id = await database.fetch_val("SELECT post_id FROM blog_post LIMIT 1")
+        if user is None or post_id is None:
+            raise SystemExit("Seed at least one user and one blog post first")
+
+        new_post = {
+            "title": "benchmark",
+            "content": "lorem ipsum " * 100,
+            "content_compressed": None,
+            "user_uuid": user["uuid"],
+            "user_username": user["username"],
+        }
+        cases = [
+            (
+                "GET_USER_BY_USERNAME_QUERY",
+                GET_USER_BY_USERNAME_QUERY,
+                {"username": user["username"]},
+            ),
+            (
+                "GET_BLOG_POST_BY_POST_ID_QUERY",
+                GET_BLOG_POST_BY_POST_ID_QUERY,
+                {"post_id": post_id},
+            ),
+            ("CREATE_BLOG_POST_QUERY", CREATE_BLOG_POST_QUERY, new_post),
+        ]
+
+        print(
+            f"{'query':<32} {'path':<10} {'p50 ms':>8} {'p95 ms':>8} {'cpu us':>8}"
+        )
+        for name, query, values in cases:
+            prepared = PreparedQuery(query)
+
+            async def via_databases() -> Any:
+                return dict(await database.fetch_one(query=query, values=values))
+
+            async def via_prepared() -> Any:
+                return await fetch_one_prepared(database, prepared, values)
+
+            transaction = await database.transaction()
+            try:
+                for path, call in (
+                    ("databases", via_databases),
+                    ("prepared", via_prepared),
+                ):
+                    stats = await measure(call, runs)
+                    print(
+                        f"{name:<32} {path:<10} {stats['p50']:>8.3f} "
+                        f"{stats['p95']:>8.3f} {stats['cpu']:>8.1f}"
+                    )
+            finally:
+                await transaction.rollback()
+    finally:
+        await database.disconnect()
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--runs", type=int, default=2000)
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("--dsn or DATABASE_URL is required")
+    asyncio.run(run(args.dsn, args.runs))
+
+
+if __name__ == "__main__":
+    main()
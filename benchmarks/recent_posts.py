@@ -0,0 +1,88 @@
+"""Latency of the recent-posts listing against a live database.
+
+Usage: python -m benchmarks.recent_posts --dsn postgresql://... --runs 200
+
+Run it before and after the blog_post partitioning migration on the same
+data. Besides timings it prints the plan, to check that partitions outside
+the RECENT_POSTS_MAX_AGE_DAYS window are pruned.
+"""
+
+# Standard library imports
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+# Third party imports
+import asyncpg
+
+RECENT_POSTS_QUERY = """
+    SELECT post_id, title, content, content_compressed, user_uuid, user_username,
+           created_at, updated_at
+    FROM blog_post
+    WHERE created_at >= $1
+      AND created_at <= $2
+      AND (created_at, post_id) < ($2, $3)
+    ORDER BY created_at DESC, post_id DESC
+    LIMIT $4
+"""
+
+
+async def run(dsn: str, runs: int, pages: int, limit: int, max_age_days: int) -> None:
+    """Time first and deeper pages of the listing."""
+    connection = await asyncpg.connect(dsn)
+    try:
+        statement = await connection.prepare(RECENT_POSTS_QUERY)
+        now = datetime.now(timezone.utc)
+        since = now - timedelta(days=max_age_days)
+        timings = {page: [] for page in range(pages)}
+        for _ in range(runs):
+            before_created_at, before_post_id = now, 2147483647
+            for page in range(pages):
+                start = time.perf_counter()
+                rows = await statement.fetch(
+                    since, before_created_at, before_post_id, limit
+                )
+                timings[page].append((time.perf_counter() - start) * 1000)
+                if not rows:
+                    break
+                before_created_at = rows[-1]["created_at"]
+                before_post_id = rows[-1]["post_id"]
+
+        print(f"{'page':>4} {'p50 ms':>8} {'p95 ms':>8}")
+        for page, samples in timings.items():
+            if len(samples) < 2:
+                continue
+            p95 = statistics.quantiles(samples, n=20)[-1]
+            print(f"{page:>4} {statistics.median(samples):>8.3f} {p95:>8.3f}")
+
+        plan = await connection.fetch(
+            "EXPLAIN (ANALYZE, COSTS OFF) " + RECENT_POSTS_QUERY,
+            since,
+            now,
+            2147483647,
+            limit,
+        )
+        print("\n".join(row[0] for row in plan))
+    finally:
+        await connection.close()
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--max-age-days", type=int, default=30)
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("--dsn or DATABASE_URL is required")
+    asyncio.run(run(args.dsn, args.runs, args.pages, args.limit, args.max_age_days))
+
+
+if __name__ == "__main__":
+    main()
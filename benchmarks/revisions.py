@@ -0,0 +1,86 @@
+"""Storage and reconstruction cost of post revision deltas.
+
+Usage: python -m benchmarks.revisions --size-kb 200 --edits 100 --interval 20
+
+Simulates a chain of small edits to one large post and compares storing
+full copies with storing deltas plus a snapshot every `interval` revisions.
+"""
+
+# Standard library imports
+import argparse
+import random
+import time
+
+from src.services.revisions import apply_delta, make_delta
+
+
+def make_post(size_kb: int, rng: random.Random) -> str:
+    """Random multi-paragraph text of about size_kb kilobytes."""
+    words = ["lorem", "ipsum", "dolor", "sit", "amet", "blog", "post", "api"]
+    lines = []
+    size = 0
+    while size < size_kb * 1024:
+        line = " ".join(rng.choice(words) for _ in range(rng.randint(5, 20))) + "\n"
+        lines.append(line)
+        size += len(line)
+    return "".join(lines)
+
+
+def edit(content: str, rng: random.Random) -> str:
+    """Change, add or remove a few lines."""
+    lines = content.splitlines(keepends=True)
+    for _ in range(rng.randint(1, 5)):
+        i = rng.randrange(len(lines))
+        action = rng.random()
+        if action < 0.6:
+            lines[i] = f"edited {rng.random()}\n"
+        elif action < 0.8:
+            lines.insert(i, f"added {rng.random()}\n")
+        elif len(lines) > 1:
+            del lines[i]
+    return "".join(lines)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-kb", type=int, default=200)
+    parser.add_argument("--edits", type=int, default=100)
+    parser.add_argument("--interval", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    versions = [make_post(args.size_kb, rng)]
+    for _ in range(args.edits):
+        versions.append(edit(versions[-1], rng))
+
+    stored = [versions[0]]
+    start = time.perf_counter()
+    for revision in range(2, len(versions) + 1):
+        old, new = versions[revision - 2], versions[revision - 1]
+        is_snapshot = (revision - 1) % args.interval == 0
+        stored.append(new if is_snapshot else make_delta(old, new))
+    encode_ms = (time.perf_counter() - start) * 1000 / args.edits
+
+    full_bytes = sum(len(v.encode()) for v in versions)
+    delta_bytes = sum(len(v.encode()) for v in stored)
+    print(f"revisions:          {len(versions)}")
+    print(f"full copies:        {full_bytes / 1024:.0f} KB")
+    print(f"deltas + snapshots: {delta_bytes / 1024:.0f} KB")
+    print(f"encode per edit:    {encode_ms:.2f} ms")
+
+    worst_ms = 0.0
+    for revision in range(1, len(versions) + 1):
+        snapshot = revision - (revision - 1) % args.interval
+        start = time.perf_counter()
+        content = stored[snapshot - 1]
+        for r in range(snapshot + 1, revision + 1):
+            content = apply_delta(content, stored[r - 1])
+        worst_ms = max(worst_ms, (time.perf_counter() - start) * 1000)
+        assert content == versions[revision - 1]
+    print(f"worst rebuild:      {worst_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
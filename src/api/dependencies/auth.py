@@ -12,7 +12,7 @@ from fastapi.security import OAuth2PasswordBearer
 from src.api.dependencies.database import get_repository
 from src.core.config import SECRET_KEY
 from src.db.repositories.users import UserRepository
-from src.models.users import UserInDB, UserPublic
+from src.models.users import UserPrincipal
 
 # from src.db.repositories.users import UsersRepository
 from src.services.auth import AuthService
@@ -26,21 +26,21 @@ async def get_user_from_token(
     *,
     token: str = Depends(reuseable_oauth),
     user_repo: UserRepository = Depends(get_repository(UserRepository)),
-) -> Union[UserInDB, UserPublic, None]:
+) -> Union[UserPrincipal, None]:
     """Get user token."""
     try:
         username = auth_service.get_data_from_token(
             token=token, secret_key=str(SECRET_KEY)
         )
-        user = await user_repo.get_user_by_username(username=username)
+        user = await user_repo.get_principal_by_username(username=username)
     except Exception:
         raise
     return user
 
 
 def get_current_active_user(
-    current_user: UserInDB = Depends(get_user_from_token),
-) -> str:
+    current_user: UserPrincipal = Depends(get_user_from_token),
+) -> UserPrincipal:
     """Get current active user from token."""
     if not current_user:
         raise HTTPException(
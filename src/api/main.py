@@ -3,7 +3,10 @@
 # Third party imports
 from fastapi import FastAPI
 
+from src.api.middleware.deadlines import DeadlineMiddleware, parse_route_timeouts
+from src.api.middleware.profiling import ProfilingMiddleware
 from src.api.routes.blog_post import router as blog_post_router
+from src.api.routes.health import router as health_router
 from src.api.routes.users import router as user_router
 from src.core import config, tasks
 
@@ -12,6 +15,22 @@ def get_application() -> FastAPI:
     """Server configs."""
     app = FastAPI(title=config.PROJECT_NAME, version=config.VERSION)
 
+    if str(config.PROFILING_TOKEN):
+        app.add_middleware(
+            ProfilingMiddleware,
+            token=str(config.PROFILING_TOKEN),
+            output_dir=config.PROFILING_OUTPUT_DIR,
+        )
+
+    app.add_middleware(
+        DeadlineMiddleware,
+        default_seconds=config.REQUEST_TIMEOUT_SECONDS,
+        route_seconds={
+            **{route: 0 for route in config.DEADLINE_EXEMPT_ROUTES},
+            **parse_route_timeouts(config.ROUTE_TIMEOUTS),
+        },
+    )
+
     # event handlers
     app.add_event_handler("startup", tasks.create_start_app_handler(app))
     app.add_event_handler("shutdown", tasks.create_stop_app_handler(app))
@@ -22,6 +41,7 @@ def get_application() -> FastAPI:
 
     app.include_router(blog_post_router, prefix="/blog_post")
     app.include_router(user_router, prefix="/user")
+    app.include_router(health_router, prefix="/health")
 
     return app
 
@@ -0,0 +1,105 @@
+"""Middleware applying per-route request deadlines."""
+
+# Standard library imports
+import asyncio
+import json
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from src.db.deadlines import DeadlineExceededError, request_deadline
+
+TIMEOUT_BODY = json.dumps({"detail": "Request deadline exceeded."}).encode()
+
+
+def parse_route_timeouts(entries: Iterable[str]) -> Dict[str, float]:
+    """Parse "METHOD /path=seconds" entries; 0 seconds disables the deadline."""
+    timeouts = {}
+    for entry in entries:
+        if not entry.strip():
+            continue
+        route, _, seconds = entry.rpartition("=")
+        timeouts[route.strip()] = float(seconds)
+    return timeouts
+
+
+class DeadlineMiddleware:
+    """Give every request a deadline and answer 504 once it passes.
+
+    The deadline is exposed to repository calls through request_deadline,
+    which DeadlineDatabase turns into query cancellation.
+    """
+
+    def __init__(
+        self, app: Callable, *, default_seconds: float, route_seconds: Dict[str, float]
+    ) -> None:
+        """Initialize wrapped app and deadlines."""
+        self.app = app
+        self.default_seconds = default_seconds
+        self.route_seconds = route_seconds
+
+    def timeout_for(self, scope: Dict[str, Any]) -> Optional[float]:
+        """Deadline in seconds for a request, None when disabled."""
+        seconds = self.route_seconds.get(
+            f"{scope['method']} {scope['path']}", self.default_seconds
+        )
+        return seconds or None
+
+    async def __call__(
+        self, scope: Dict[str, Any], receive: Callable, send: Callable
+    ) -> None:
+        """Run the request under its deadline."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timeout = self.timeout_for(scope)
+        if timeout is None:
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_tracking_start(message: Dict[str, Any]) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        task = asyncio.current_task()
+        expired = False
+
+        def expire() -> None:
+            nonlocal expired
+            expired = True
+            task.cancel()  # type: ignore
+
+        token = request_deadline.set(time.monotonic() + timeout)
+        handle = asyncio.get_running_loop().call_later(timeout, expire)
+        try:
+            await self.app(scope, receive, send_tracking_start)
+        except asyncio.CancelledError:
+            if not expired:
+                raise
+            if hasattr(task, "uncancel"):
+                task.uncancel()  # type: ignore
+            if not response_started:
+                await self.send_timeout(send)
+        except DeadlineExceededError:
+            if not response_started:
+                await self.send_timeout(send)
+        finally:
+            handle.cancel()
+            request_deadline.reset(token)
+
+    async def send_timeout(self, send: Callable) -> None:
+        """Send a 504 response."""
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 504,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(TIMEOUT_BODY)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": TIMEOUT_BODY})
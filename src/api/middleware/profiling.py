@@ -0,0 +1,105 @@
+"""Middleware for on-demand per-request profiling."""
+
+# Standard library imports
+import cProfile
+import hmac
+import io
+import logging
+import os
+import pstats
+from typing import Any, Callable, Dict, Tuple
+
+# Third party imports
+from starlette.concurrency import run_in_threadpool
+
+from src.utils.uuids import generate_uuid
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile-token"
+PROFILE_ID_HEADER = b"x-profile-id"
+PROFILE_SKIPPED_HEADER = b"x-profile-skipped"
+
+
+class ProfilingMiddleware:
+    """Profile a single request when it carries the admin profiling token.
+
+    The .prof file (for snakeviz/pstats) and a text summary of the top
+    functions by cumulative time are written to output_dir, and the
+    profile id is returned in the X-Profile-Id response header. cProfile
+    sees the whole event loop thread, so other requests served while the
+    profiled one is in flight show up in its profile too. Only one request
+    is profiled at a time; others are served unprofiled with an
+    X-Profile-Skipped header.
+    """
+
+    def __init__(
+        self, app: Callable, *, token: str, output_dir: str, top: int = 40
+    ) -> None:
+        """Initialize wrapped app, admin token and output location."""
+        self.app = app
+        self.token = token.encode()
+        self.output_dir = output_dir
+        self.top = top
+        self.profiling = False
+        os.makedirs(output_dir, exist_ok=True)
+
+    async def __call__(
+        self, scope: Dict[str, Any], receive: Callable, send: Callable
+    ) -> None:
+        """Run the request, profiling it if the token matches."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        supplied = dict(scope["headers"]).get(PROFILE_HEADER)
+        if not supplied or not hmac.compare_digest(supplied, self.token):
+            await self.app(scope, receive, send)
+            return
+
+        # Only one cProfile profiler can be active in a thread.
+        if self.profiling:
+            await self.app(
+                scope, receive, self.with_header(send, (PROFILE_SKIPPED_HEADER, b"busy"))
+            )
+            return
+
+        profile_id = generate_uuid()
+        profiler = cProfile.Profile()
+        self.profiling = True
+        profiler.enable()
+        try:
+            await self.app(
+                scope,
+                receive,
+                self.with_header(send, (PROFILE_ID_HEADER, profile_id.encode())),
+            )
+        finally:
+            profiler.disable()
+            self.profiling = False
+            await run_in_threadpool(
+                self.save, profiler, profile_id, f"{scope['method']} {scope['path']}"
+            )
+
+    @staticmethod
+    def with_header(send: Callable, header: Tuple[bytes, bytes]) -> Callable:
+        """Wrap send to add a header to the response start."""
+
+        async def send_with_header(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [header]
+            await send(message)
+
+        return send_with_header
+
+    def save(self, profiler: cProfile.Profile, profile_id: str, label: str) -> None:
+        """Write the raw profile and a text summary."""
+        base = os.path.join(self.output_dir, profile_id)
+        profiler.dump_stats(f"{base}.prof")
+        summary = io.StringIO()
+        summary.write(f"{label}\n\n")
+        stats = pstats.Stats(profiler, stream=summary)
+        stats.sort_stats("cumulative").print_stats(self.top)
+        stats.print_callees(self.top)
+        with open(f"{base}.txt", "w") as f:
+            f.write(summary.getvalue())
+        logger.info("Saved profile %s for %s to %s.prof", profile_id, label, base)
@@ -1,17 +1,34 @@
 """Router for Users."""
 
-# Third party imports
-from typing import List, Union
+# Standard library imports
+import asyncio
+import json
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Union
 
-from fastapi import APIRouter, Depends, Form, HTTPException, status
+# Third party imports
+from fastapi import APIRouter, Depends, Form, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from starlette.requests import Request
 
 from src.api.dependencies.auth import get_current_active_user
 from src.api.dependencies.database import get_repository
-from src.core.config import TOKEN_TYPE
+from src.core.config import POST_EVENTS_HEARTBEAT_SECONDS, TOKEN_TYPE
 from src.db.repositories.blog_post import BlogPostRepository
-from src.models.blog_post import BlogPostPublic, CreateBlogPost, UpdateBlogPost
-from src.models.users import UserInDB, UserPublic
+from src.models.blog_post import (
+    BlogPostInDB,
+    BlogPostPublic,
+    CreateBlogPost,
+    UpdateBlogPost,
+)
+from src.models.post_revision import PostRevisionMeta, PostRevisionPublic
+from src.models.tag import TagPublic
+from src.models.trending import TrendingPostPublic
+from src.models.users import UserPrincipal, UserPublic
 from src.services.auth import AuthService
+from src.services.idempotency import idempotency_store
+from src.services.post_events import post_events
+from src.services.trending import trending_cache, view_counter
 
 router = APIRouter()
 auth_service = AuthService()
@@ -25,21 +42,37 @@ auth_service = AuthService()
 async def create_new_blog_post(
     title: str = Form(...),
     content: str = Form(...),
-    current_user: UserInDB = Depends(get_current_active_user),
+    tags: Optional[List[str]] = Form(None),
+    idempotency_key: Optional[str] = Header(None),
+    current_user: UserPrincipal = Depends(get_current_active_user),
     blog_post_repo: BlogPostRepository = Depends(get_repository(BlogPostRepository)),
 ) -> UserPublic:
     """Create a new user."""
-    new_blog_post = CreateBlogPost(
-        title=title,
-        content=content,
-    )
-    created_blog_post = await blog_post_repo.create_new_blog_post(
-        new_blog_post=new_blog_post,
-        user_uuid=current_user.uuid,
-        username=current_user.username,
-    )
 
-    return created_blog_post
+    async def create() -> BlogPostInDB:
+        new_blog_post = CreateBlogPost(
+            title=title,
+            content=content,
+            tags=tags,
+        )
+        created_blog_post = await blog_post_repo.create_new_blog_post(
+            new_blog_post=new_blog_post,
+            user_uuid=current_user.uuid,
+            username=current_user.username,
+        )
+        # Raised rather than returned so the failure is not stored.
+        if isinstance(created_blog_post, str):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=created_blog_post
+            )
+        return created_blog_post
+
+    return await idempotency_store.run(
+        key=idempotency_key,
+        scope=f"blog_post:create:{current_user.uuid}",
+        payload={"title": title, "content": content, "tags": tags},
+        handler=create,
+    )
 
 
 @router.get("/get/", response_model=Union[BlogPostPublic, str])
@@ -52,6 +85,7 @@ async def get_blog_post(
 
     result = await blog_post_repo.get_blog_post(post_id)
     if result:
+        view_counter.record(post_id)
         return result
     return "No blog post found"
 
@@ -69,19 +103,171 @@ async def get_all_blog_post(
     return await blog_post_repo.get_all_blog_post()
 
 
+@router.get(
+    "/feed",
+    response_model=List[BlogPostPublic],
+)
+async def get_feed(
+    before: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: UserPrincipal = Depends(get_current_active_user),
+    blog_post_repo: BlogPostRepository = Depends(get_repository(BlogPostRepository)),
+):
+    """Get posts by followed authors, newest first.
+
+    Pass the post_id of the last post received as `before` to get the next page.
+    """
+    return await blog_post_repo.get_feed(
+        user_uuid=current_user.uuid, before=before, limit=limit
+    )
+
+
+@router.get(
+    "/trending/",
+    response_model=List[TrendingPostPublic],
+)
+async def get_trending_blog_posts(
+    limit: int = Query(10, ge=1, le=50),
+    current_client: str = Depends(get_current_active_user),
+):
+    """Get trending blog posts from the precomputed ranking."""
+    return trending_cache.posts[:limit]
+
+
+@router.get(
+    "/recent/",
+    response_model=List[BlogPostPublic],
+)
+async def get_recent_blog_posts(
+    before_created_at: Optional[datetime] = None,
+    before_post_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_client: str = Depends(get_current_active_user),
+    blog_post_repo: BlogPostRepository = Depends(get_repository(BlogPostRepository)),
+):
+    """Get recent blog posts, newest first.
+
+    Pass created_at and post_id of the last post received as `before_created_at`
+    and `before_post_id` to get the next page.
+    """
+    return await blog_post_repo.get_recent_blog_posts(
+        before_created_at=before_created_at,
+        before_post_id=before_post_id,
+        limit=limit,
+    )
+
+
+@router.get(
+    "/by_tag/{tag}",
+    response_model=List[BlogPostPublic],
+)
+async def get_blog_posts_by_tag(
+    tag: str,
+    before: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_client: str = Depends(get_current_active_user),
+    blog_post_repo: BlogPostRepository = Depends(get_repository(BlogPostRepository)),
+):
+    """Get blog posts with a tag, newest first.
+
+    Pass the post_id of the last post received as `before` to get the next page.
+    """
+    return await blog_post_repo.get_blog_posts_by_tag(
+        tag=tag, before=before, limit=limit
+    )
+
+
+@router.get(
+    "/tags/",
+    response_model=List[TagPublic],
+)
+async def get_tag_counts(
+    limit: int = Query(50, ge=1, le=500),
+    current_client: str = Depends(get_current_active_user),
+    blog_post_repo: BlogPostRepository = Depends(get_repository(BlogPostRepository)),
+):
+    """Get the most used tags and their post counts."""
+    return await blog_post_repo.get_tag_counts(limit=limit)
+
+
+@router.get("/events/")
+async def stream_blog_post_events(
+    request: Request,
+    current_client: str = Depends(get_current_active_user),
+) -> StreamingResponse:
+    """Server-Sent Events stream of blog post created/updated/deleted events."""
+
+    async def event_stream() -> AsyncIterator[str]:
+        async with post_events.subscribe() as queue:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=POST_EVENTS_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream.
+                    yield ": heartbeat\n\n"
+                    continue
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.put("/update/", response_model=BlogPostPublic)
 async def update_blog_post(
     post_id: int,
     title: str,
     content: str,
-    current_user: UserInDB = Depends(get_current_active_user),
+    tags: Optional[List[str]] = Query(None),
+    current_user: UserPrincipal = Depends(get_current_active_user),
     blog_post_repo: BlogPostRepository = Depends(get_repository(BlogPostRepository)),
 ) -> UserPublic:
     """Update user route."""
-    updated_blog_post = UpdateBlogPost(title=title, content=content)
-    return await blog_post_repo.update_blog_posts(
-        blog_post_updated_params=updated_blog_post, post_id=post_id
+    updated_blog_post = UpdateBlogPost(title=title, content=content, tags=tags)
+    updated = await blog_post_repo.update_blog_posts(
+        blog_post_updated_params=updated_blog_post,
+        post_id=post_id,
+        editor_username=current_user.username,
+    )
+    if not updated:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No blog post found",
+        )
+    return updated
+
+
+@router.get("/revisions/", response_model=List[PostRevisionMeta])
+async def get_blog_post_revisions(
+    post_id: int,
+    current_client: str = Depends(get_current_active_user),
+    blog_post_repo: BlogPostRepository = Depends(get_repository(BlogPostRepository)),
+):
+    """List revisions of a blog post with their stored size."""
+    return await blog_post_repo.revisions_repo.get_post_revisions(post_id=post_id)
+
+
+@router.get("/revision/", response_model=PostRevisionPublic)
+async def get_blog_post_revision(
+    post_id: int,
+    revision: int,
+    current_client: str = Depends(get_current_active_user),
+    blog_post_repo: BlogPostRepository = Depends(get_repository(BlogPostRepository)),
+):
+    """Get a blog post as it was at a revision."""
+    result = await blog_post_repo.revisions_repo.get_post_revision(
+        post_id=post_id, revision=revision
     )
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No revision found",
+        )
+    return result
 
 
 @router.delete(
@@ -91,7 +277,7 @@ async def update_blog_post(
 )
 async def delete_blog_post(
     post_id: int,
-    current_user: UserInDB = Depends(get_current_active_user),
+    current_user: UserPrincipal = Depends(get_current_active_user),
     blog_post_repo: BlogPostRepository = Depends(get_repository(BlogPostRepository)),
 ) -> str:
     """Delete blog post"""
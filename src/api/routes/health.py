@@ -0,0 +1,37 @@
+"""Router for health checks."""
+
+# Third party imports
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from starlette.requests import Request
+
+from src.db.deadlines import query_timeouts
+from src.db.repositories.base import single_flight
+
+router = APIRouter()
+
+
+@router.get("/live", name="health:live")
+async def live() -> dict:
+    """Worker process is up."""
+    return {"status": "alive"}
+
+
+@router.get("/ready", name="health:ready")
+async def ready(request: Request) -> JSONResponse:
+    """Worker has finished warm-up and has a connected database."""
+    database = getattr(request.app.state, "_db", None)
+    if getattr(request.app.state, "ready", False) and database and database.is_connected:
+        return JSONResponse({"status": "ready"})
+    return JSONResponse(
+        {"status": "starting"}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+
+
+@router.get("/stats", name="health:stats")
+async def stats() -> dict:
+    """This worker's query counters."""
+    return {
+        "single_flight": single_flight.stats(),
+        "query_timeouts": query_timeouts.stats(),
+    }
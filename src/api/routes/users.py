@@ -1,7 +1,10 @@
 """Router for Users."""
 
+# Standard library imports
+from typing import Optional
+
 # Third party imports
-from fastapi import APIRouter, Depends, Form, HTTPException, status
+from fastapi import APIRouter, Depends, Form, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import EmailStr
 
@@ -10,8 +13,15 @@ from src.api.dependencies.database import get_repository
 from src.core.config import TOKEN_TYPE
 from src.db.repositories.users import UserRepository
 from src.models.token import AccessToken
-from src.models.users import CreateUser, UserInDB, UserPublic
+from src.models.users import (
+    AuthorPublic,
+    CreateUser,
+    UserInDB,
+    UserPrincipal,
+    UserPublic,
+)
 from src.services.auth import AuthService
+from src.services.idempotency import idempotency_store
 
 router = APIRouter()
 auth_service = AuthService()
@@ -28,25 +38,40 @@ async def register_new_user(
     first_name: str = Form(...),
     last_name: str = Form(...),
     username: str = Form(...),
+    idempotency_key: Optional[str] = Header(None),
     user_repo: UserRepository = Depends(get_repository(UserRepository)),
 ) -> UserPublic:
     """Create a new user."""
-    new_user = CreateUser(
-        email=email,
-        password=password,
-        first_name=first_name,
-        last_name=last_name,
-        username=username,
-    )
-    created_user = await user_repo.register_new_user(new_user=new_user)
-    created_user = UserInDB(**created_user)
 
+    # Replays get a fresh token; the stored result never carries one.
+    async def register() -> UserPublic:
+        new_user = CreateUser(
+            email=email,
+            password=password,
+            first_name=first_name,
+            last_name=last_name,
+            username=username,
+        )
+        created_user = await user_repo.register_new_user(new_user=new_user)
+        return UserPublic(**UserInDB(**created_user).dict())
+
+    created_user = await idempotency_store.run(
+        key=idempotency_key,
+        scope=f"user:create:{username}",
+        payload={
+            "email": email,
+            "password": password,
+            "first_name": first_name,
+            "last_name": last_name,
+            "username": username,
+        },
+        handler=register,
+    )
     access_token = AccessToken(
         access_token=auth_service.create_access_token_for_user(user=created_user),
         token_type=TOKEN_TYPE,
     )
-
-    return UserPublic(**created_user.copy(update={"access_token": access_token}).dict())
+    return created_user.copy(update={"access_token": access_token})
 
 
 @router.post(
@@ -76,10 +101,71 @@ async def user_authenticate(
 
 @router.get("/me/", response_model=UserPublic)
 async def get_current_user(
-    current_user: UserInDB = Depends(get_current_active_user),
+    current_user: UserPrincipal = Depends(get_current_active_user),
+    user_repo: UserRepository = Depends(get_repository(UserRepository)),
 ) -> UserPublic:
     """Get current user logged in."""
-    return current_user
+    stats = await user_repo.get_author_stats(user_uuid=current_user.uuid)
+    return UserPublic(**{**dict(current_user), **stats.dict()})
+
+
+@router.get("/author/{username}", response_model=AuthorPublic)
+async def get_author(
+    username: str,
+    user_repo: UserRepository = Depends(get_repository(UserRepository)),
+) -> AuthorPublic:
+    """Get public author profile and post stats."""
+    author = await user_repo.get_author_by_username(username=username)
+    if not author:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No author found.",
+        )
+    return author
+
+
+async def get_followee(user_repo: UserRepository, username: str) -> UserPrincipal:
+    """Look up the author to follow or unfollow."""
+    followee = await user_repo.get_principal_by_username(username=username)
+    if not followee:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No author found.",
+        )
+    return followee
+
+
+@router.post("/follow/{username}", response_model=AuthorPublic)
+async def follow_author(
+    username: str,
+    current_user: UserPrincipal = Depends(get_current_active_user),
+    user_repo: UserRepository = Depends(get_repository(UserRepository)),
+) -> Optional[AuthorPublic]:
+    """Follow an author."""
+    followee = await get_followee(user_repo, username)
+    if followee.uuid == current_user.uuid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You cannot follow yourself.",
+        )
+    await user_repo.follow_user(
+        follower_uuid=current_user.uuid, followee_uuid=followee.uuid
+    )
+    return await user_repo.get_author_by_username(username=username)
+
+
+@router.delete("/follow/{username}", response_model=AuthorPublic)
+async def unfollow_author(
+    username: str,
+    current_user: UserPrincipal = Depends(get_current_active_user),
+    user_repo: UserRepository = Depends(get_repository(UserRepository)),
+) -> Optional[AuthorPublic]:
+    """Unfollow an author."""
+    followee = await get_followee(user_repo, username)
+    await user_repo.unfollow_user(
+        follower_uuid=current_user.uuid, followee_uuid=followee.uuid
+    )
+    return await user_repo.get_author_by_username(username=username)
 
 
 @router.delete(
@@ -88,7 +174,7 @@ async def get_current_user(
     status_code=status.HTTP_200_OK,
 )
 async def delete_user(
-    current_user: UserInDB = Depends(get_current_active_user),
+    current_user: UserPrincipal = Depends(get_current_active_user),
     user_repo: UserRepository = Depends(get_repository(UserRepository)),
 ) -> str:
     """Delete user route."""
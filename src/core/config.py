@@ -5,7 +5,7 @@ import logging
 
 from databases import DatabaseURL
 from starlette.config import Config
-from starlette.datastructures import Secret
+from starlette.datastructures import CommaSeparatedStrings, Secret
 
 config = Config(".env")
 
@@ -26,6 +26,79 @@ JWT_ALGORITHM = config("JWT_ALGORITHM", cast=str, default="HS256")
 JWT_TOKEN_PREFIX = config("JWT_TOKEN_PREFIX", cast=str, default="Bearer")
 TOKEN_TYPE = config("TOKEN_TYPE", cast=str, default="bearer")
 
+# Requests sending this value in X-Profile-Token are profiled. Empty disables
+# profiling and the middleware is not installed at all.
+PROFILING_TOKEN = config("PROFILING_TOKEN", cast=Secret, default="")
+PROFILING_OUTPUT_DIR = config("PROFILING_OUTPUT_DIR", cast=str, default="profiles")
+
+BCRYPT_ROUNDS = config("BCRYPT_ROUNDS", cast=int, default=12)
+
+# Every Nth post revision stores full content instead of a delta, bounding
+# how many deltas are applied to rebuild any revision.
+REVISION_SNAPSHOT_INTERVAL = config("REVISION_SNAPSHOT_INTERVAL", cast=int, default=20)
+# Edits whose old plus new content is longer are stored as snapshots, since
+# diffing cost grows quadratically with size in the worst case.
+REVISION_DELTA_MAX_CHARS = config("REVISION_DELTA_MAX_CHARS", cast=int, default=200000)
+
+# Opt-in: post content at least this large is stored zlib-compressed in
+# blog_post.content_compressed instead of blog_post.content.
+CONTENT_COMPRESSION_ENABLED = config(
+    "CONTENT_COMPRESSION_ENABLED", cast=bool, default=False
+)
+CONTENT_COMPRESSION_THRESHOLD_BYTES = config(
+    "CONTENT_COMPRESSION_THRESHOLD_BYTES", cast=int, default=16384
+)
+CONTENT_COMPRESSION_LEVEL = config("CONTENT_COMPRESSION_LEVEL", cast=int, default=6)
+
+# "postgres" shares post events between workers via LISTEN/NOTIFY; "memory"
+# only delivers events published in the same process.
+POST_EVENTS_BACKEND = config("POST_EVENTS_BACKEND", cast=str, default="postgres")
+POST_EVENTS_QUEUE_SIZE = config("POST_EVENTS_QUEUE_SIZE", cast=int, default=100)
+POST_EVENTS_HEARTBEAT_SECONDS = config(
+    "POST_EVENTS_HEARTBEAT_SECONDS", cast=int, default=15
+)
+
+# Opt-in monthly range partitioning of blog_post on created_at. Workers keep
+# partitions created this many months ahead.
+BLOG_POST_PARTITIONED = config("BLOG_POST_PARTITIONED", cast=bool, default=False)
+BLOG_POST_PARTITION_MONTHS_AHEAD = config(
+    "BLOG_POST_PARTITION_MONTHS_AHEAD", cast=int, default=3
+)
+RECENT_POSTS_MAX_AGE_DAYS = config("RECENT_POSTS_MAX_AGE_DAYS", cast=int, default=30)
+
+# Requests are answered with 504 and their queries cancelled once this many
+# seconds pass. ROUTE_TIMEOUTS overrides it per route as
+# "METHOD /path=seconds" entries, with 0 meaning no deadline.
+REQUEST_TIMEOUT_SECONDS = config("REQUEST_TIMEOUT_SECONDS", cast=float, default=10.0)
+ROUTE_TIMEOUTS = config("ROUTE_TIMEOUTS", cast=CommaSeparatedStrings, default="")
+# "METHOD /path" entries never given a deadline, such as long-lived streams.
+DEADLINE_EXEMPT_ROUTES = config(
+    "DEADLINE_EXEMPT_ROUTES",
+    cast=CommaSeparatedStrings,
+    default="GET /blog_post/events/",
+)
+
+# Authors with more followers than this are not fanned out to timelines on
+# write; their posts are merged into followers' feeds at read time.
+FANOUT_MAX_FOLLOWERS = config("FANOUT_MAX_FOLLOWERS", cast=int, default=10000)
+# Recent posts of an author copied into a timeline when it starts following.
+FOLLOW_BACKFILL_POSTS = config("FOLLOW_BACKFILL_POSTS", cast=int, default=20)
+
+# Trending ranking: recomputed every TRENDING_REFRESH_SECONDS over posts from
+# the last TRENDING_WINDOW_HOURS and served from each worker's memory.
+TRENDING_REFRESH_SECONDS = config("TRENDING_REFRESH_SECONDS", cast=int, default=60)
+TRENDING_WINDOW_HOURS = config("TRENDING_WINDOW_HOURS", cast=int, default=72)
+TRENDING_SIZE = config("TRENDING_SIZE", cast=int, default=50)
+TRENDING_GRAVITY = config("TRENDING_GRAVITY", cast=float, default=1.5)
+TRENDING_EDIT_WEIGHT = config("TRENDING_EDIT_WEIGHT", cast=float, default=5.0)
+
+IDEMPOTENCY_KEY_TTL_SECONDS = config(
+    "IDEMPOTENCY_KEY_TTL_SECONDS", cast=int, default=86400
+)
+IDEMPOTENCY_STORE_MAX_KEYS = config(
+    "IDEMPOTENCY_STORE_MAX_KEYS", cast=int, default=10000
+)
+
 
 POSTGRES_USERNAME = config("POSTGRES_USERNAME", cast=str)
 POSTGRES_PASSWORD = config("POSTGRES_PASSWORD", cast=Secret)
@@ -37,3 +110,8 @@ DATABASE_URL = config(
     cast=DatabaseURL,
     default=f"postgresql://{POSTGRES_USERNAME}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}/{POSTGRES_DB}",
 )
+
+DB_MIN_POOL_SIZE = config("DB_MIN_POOL_SIZE", cast=int, default=5)
+DB_MAX_POOL_SIZE = config("DB_MAX_POOL_SIZE", cast=int, default=10)
+# Server-side cap for statements run outside a request deadline.
+DB_STATEMENT_TIMEOUT_MS = config("DB_STATEMENT_TIMEOUT_MS", cast=int, default=30000)
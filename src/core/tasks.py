@@ -1,17 +1,85 @@
 """Core task: Connect and Disconnect to db when application starts and stops."""
 
 # Standard library imports
-from typing import Callable
+import asyncio
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable
 
 # Third party imports is right
 from fastapi import FastAPI
 
-from src.db.tasks import close_db_connection, connect_to_db
+from src.core.config import (
+    BLOG_POST_PARTITIONED,
+    SECRET_KEY,
+    TRENDING_REFRESH_SECONDS,
+)
+from src.db.tasks import (
+    close_db_connection,
+    connect_to_db,
+    ensure_blog_post_partitions,
+    is_blog_post_partitioned,
+    refresh_trending_posts,
+    start_post_events_listener,
+    stop_post_events_listener,
+    warm_up_db,
+)
+from src.models.blog_post import BlogPostPublic
+from src.models.users import UserPrincipal, UserPublic
+from src.services.auth import AuthService, pwd_context
+
+auth_service = AuthService()
+
+logger = logging.getLogger(__name__)
+
+PARTITION_MAINTENANCE_INTERVAL_SECONDS = 24 * 60 * 60
+
+
+def start_periodic_task(
+    app: FastAPI, name: str, interval: float, func: Callable[[], Awaitable[None]]
+) -> None:
+    """Run func every interval seconds until the app stops."""
+
+    async def run() -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await func()
+            except Exception as e:
+                print(f"Error in periodic task {name}", e)
+
+    app.state.background_tasks.append(asyncio.create_task(run(), name=name))
+
+
+def warm_up_auth_and_models() -> None:
+    """Load the bcrypt backend, PyJWT and pydantic validators once."""
+    pwd_context.hash("warm-up-password")
+    now = datetime.now()
+    principal = UserPrincipal(
+        uuid="warm-up",
+        email="warm-up@example.com",
+        first_name="warm",
+        last_name="up",
+        username="warm-up",
+        created_at=now,
+        updated_at=now,
+    )
+    token = auth_service.create_access_token_for_user(user=principal)
+    auth_service.get_data_from_token(token=str(token), secret_key=str(SECRET_KEY))
+    UserPublic(**principal.dict())
+    BlogPostPublic(
+        post_id=0,
+        title="warm-up",
+        content="",
+        tags=["warm-up"],
+        created_at=now,
+        updated_at=now,
+    )
 
 
 def create_start_app_handler(app: FastAPI) -> Callable:
     """
-    It returns a function that connects to the database.
+    It returns a function that connects to the database and warms up the worker.
 
     Args:
       app (FastAPI): FastAPI
@@ -19,10 +87,45 @@ def create_start_app_handler(app: FastAPI) -> Callable:
     Returns:
       A function that takes no arguments and returns None.
     """
-    """Connect to db."""
+    app.state.ready = False
+    app.state.background_tasks = []
 
     async def start_app():
         await connect_to_db(app)
+        # The schema decides: the flag only takes effect at migration time.
+        partitioned = await is_blog_post_partitioned(app)
+        if BLOG_POST_PARTITIONED and not partitioned:
+            logger.warning(
+                "BLOG_POST_PARTITIONED is set but blog_post is not partitioned: "
+                "the flag is only read when revision e5a9c7b2d1f4 runs, and it "
+                "was not set then"
+            )
+        if partitioned:
+            await ensure_blog_post_partitions(app)
+            start_periodic_task(
+                app,
+                "blog_post_partitions",
+                PARTITION_MAINTENANCE_INTERVAL_SECONDS,
+                lambda: ensure_blog_post_partitions(app),
+            )
+        await warm_up_db(app)
+        try:
+            await refresh_trending_posts(app)
+        except Exception as e:
+            # Served empty until the next periodic refresh.
+            print("Error loading trending posts", e)
+        start_periodic_task(
+            app,
+            "trending_posts",
+            TRENDING_REFRESH_SECONDS,
+            lambda: refresh_trending_posts(app),
+        )
+        warm_up_auth_and_models()
+        # Builds every route's pydantic schemas ahead of the first /docs hit.
+        app.openapi()
+        await start_post_events_listener()
+        app.state.ready = True
+        print("Worker warmed up and ready")
 
     return start_app
 
@@ -31,6 +134,11 @@ def create_stop_app_handler(app: FastAPI) -> Callable:
     """Disconnect db."""
 
     async def stop_app() -> None:
+        app.state.ready = False
+        for task in app.state.background_tasks:
+            task.cancel()
+        await asyncio.gather(*app.state.background_tasks, return_exceptions=True)
+        await stop_post_events_listener()
         await close_db_connection(app)
 
     return stop_app
@@ -0,0 +1,27 @@
+"""add blog post user uuid post id index
+
+Revision ID: 0a7c3e5b9d21
+Revises: f2b6d8e0a4c9
+Create Date: 2023-03-18 12:55:37.102844
+
+"""
+from src.db.online_migrations import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision = "0a7c3e5b9d21"
+down_revision = "f2b6d8e0a4c9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade DB"""
+    # Fan-out on read of prolific authors' posts in the home feed.
+    create_index_concurrently(
+        "ix_blog_post_user_uuid_post_id", "blog_post", ["user_uuid", "post_id"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade DB"""
+    drop_index_concurrently("ix_blog_post_user_uuid_post_id")
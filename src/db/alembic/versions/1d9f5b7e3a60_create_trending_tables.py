@@ -0,0 +1,62 @@
+"""create trending tables
+
+Revision ID: 1d9f5b7e3a60
+Revises: 0a7c3e5b9d21
+Create Date: 2023-04-01 15:18:52.640117
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "1d9f5b7e3a60"
+down_revision = "0a7c3e5b9d21"
+branch_labels = None
+depends_on = None
+
+
+def create_post_activity_table() -> None:
+    """Create Post Activity Table"""
+    op.create_table(
+        "post_activity",
+        # No foreign key: blog_post may be partitioned.
+        sa.Column("post_id", sa.Integer, primary_key=True),
+        sa.Column("view_count", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+
+
+def create_trending_post_table() -> None:
+    """Create Trending Post Table"""
+    op.create_table(
+        "trending_post",
+        sa.Column("rank", sa.Integer, primary_key=True),
+        sa.Column("post_id", sa.Integer, nullable=False),
+        sa.Column("title", sa.String, nullable=False),
+        sa.Column("user_username", sa.String, nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("score", sa.Float, nullable=False),
+        sa.Column(
+            "computed_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+
+
+def upgrade() -> None:
+    """Upgrade DB"""
+    create_post_activity_table()
+    create_trending_post_table()
+
+
+def downgrade() -> None:
+    """Downgrade DB"""
+    op.drop_table("trending_post")
+    op.drop_table("post_activity")
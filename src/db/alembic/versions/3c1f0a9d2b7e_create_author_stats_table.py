@@ -0,0 +1,130 @@
+"""create author stats table
+
+Revision ID: 3c1f0a9d2b7e
+Revises: 8abf6304a9e7
+Create Date: 2023-01-14 10:12:41.318402
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3c1f0a9d2b7e"
+down_revision = "8abf6304a9e7"
+branch_labels = None
+depends_on = None
+
+
+def create_author_stats_table() -> None:
+    """Create Author Stats Table"""
+    op.create_table(
+        "author_stats",
+        sa.Column(
+            "user_uuid",
+            sa.String,
+            sa.ForeignKey("users.uuid", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("post_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("last_post_at", sa.TIMESTAMP(timezone=True), nullable=True),
+    )
+    # Used to recompute last_post_at when an author's latest post is deleted.
+    op.create_index(
+        "ix_blog_post_user_uuid_created_at", "blog_post", ["user_uuid", "created_at"]
+    )
+
+
+def create_author_stats_triggers() -> None:
+    """Keep author stats in step with users and blog_post."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION create_author_stats_row()
+            RETURNS TRIGGER AS
+        $$
+        BEGIN
+            INSERT INTO author_stats (user_uuid) VALUES (NEW.uuid)
+            ON CONFLICT (user_uuid) DO NOTHING;
+            RETURN NEW;
+        END;
+        $$ language 'plpgsql';
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION update_author_stats_on_post()
+            RETURNS TRIGGER AS
+        $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO author_stats (user_uuid, post_count, last_post_at)
+                VALUES (NEW.user_uuid, 1, NEW.created_at)
+                ON CONFLICT (user_uuid) DO UPDATE
+                SET post_count = author_stats.post_count + 1,
+                    last_post_at = GREATEST(author_stats.last_post_at, EXCLUDED.last_post_at);
+                RETURN NEW;
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE author_stats
+                SET post_count = GREATEST(post_count - 1, 0),
+                    last_post_at = CASE
+                        WHEN last_post_at > OLD.created_at THEN last_post_at
+                        ELSE (
+                            SELECT max(created_at) FROM blog_post
+                            WHERE user_uuid = OLD.user_uuid
+                        )
+                    END
+                WHERE user_uuid = OLD.user_uuid;
+                RETURN OLD;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql';
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER create_user_author_stats
+            AFTER INSERT
+            ON users
+            FOR EACH ROW
+        EXECUTE PROCEDURE create_author_stats_row()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER update_blog_post_author_stats
+            AFTER INSERT OR DELETE
+            ON blog_post
+            FOR EACH ROW
+        EXECUTE PROCEDURE update_author_stats_on_post()
+        """
+    )
+
+
+def backfill_author_stats() -> None:
+    """Populate stats for existing users and posts."""
+    op.execute(
+        """
+        INSERT INTO author_stats (user_uuid, post_count, last_post_at)
+        SELECT users.uuid, count(blog_post.post_id), max(blog_post.created_at)
+        FROM users
+        LEFT JOIN blog_post ON blog_post.user_uuid = users.uuid
+        GROUP BY users.uuid
+        """
+    )
+
+
+def upgrade() -> None:
+    """Upgrade DB"""
+    create_author_stats_table()
+    create_author_stats_triggers()
+    backfill_author_stats()
+
+
+def downgrade() -> None:
+    """Downgrade DB"""
+    op.execute("DROP TRIGGER IF EXISTS update_blog_post_author_stats ON blog_post")
+    op.execute("DROP TRIGGER IF EXISTS create_user_author_stats ON users")
+    op.execute("DROP FUNCTION IF EXISTS update_author_stats_on_post")
+    op.execute("DROP FUNCTION IF EXISTS create_author_stats_row")
+    op.drop_index("ix_blog_post_user_uuid_created_at", table_name="blog_post")
+    op.drop_table("author_stats")
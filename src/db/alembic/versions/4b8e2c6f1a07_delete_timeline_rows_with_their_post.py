@@ -0,0 +1,55 @@
+"""delete timeline rows with their post
+
+Revision ID: 4b8e2c6f1a07
+Revises: 1d9f5b7e3a60
+Create Date: 2023-04-08 10:22:37.514093
+
+timeline has no foreign key to blog_post, which may be partitioned. A
+trigger removes a post's timeline rows in the deleting transaction instead,
+including posts deleted by the users.uuid cascade. Orphans left by deleted
+users before this revision are removed.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "4b8e2c6f1a07"
+down_revision = "1d9f5b7e3a60"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade DB"""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION delete_blog_post_timeline()
+            RETURNS TRIGGER AS
+        $$
+        BEGIN
+            DELETE FROM timeline WHERE post_id = OLD.post_id;
+            RETURN OLD;
+        END;
+        $$ language 'plpgsql';
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER delete_blog_post_timeline
+            AFTER DELETE
+            ON blog_post
+            FOR EACH ROW
+        EXECUTE PROCEDURE delete_blog_post_timeline()
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM timeline AS t
+        WHERE NOT EXISTS (SELECT 1 FROM blog_post AS b WHERE b.post_id = t.post_id)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade DB"""
+    op.execute("DROP TRIGGER IF EXISTS delete_blog_post_timeline ON blog_post")
+    op.execute("DROP FUNCTION IF EXISTS delete_blog_post_timeline")
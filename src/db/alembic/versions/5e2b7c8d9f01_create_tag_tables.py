@@ -0,0 +1,95 @@
+"""create tag tables
+
+Revision ID: 5e2b7c8d9f01
+Revises: 3c1f0a9d2b7e
+Create Date: 2023-01-21 16:04:52.901733
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5e2b7c8d9f01"
+down_revision = "3c1f0a9d2b7e"
+branch_labels = None
+depends_on = None
+
+
+def create_tag_table() -> None:
+    """Create Tag Table"""
+    op.create_table(
+        "tag",
+        sa.Column("tag_id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String, unique=True, nullable=False),
+        sa.Column("post_count", sa.Integer, nullable=False, server_default="0"),
+    )
+    # Serves the tag counts listing without sorting the whole table.
+    op.create_index("ix_tag_post_count_name", "tag", ["post_count", "name"])
+
+
+def create_post_tag_table() -> None:
+    """Create Post Tag Table"""
+    op.create_table(
+        "post_tag",
+        sa.Column(
+            "post_id",
+            sa.Integer,
+            sa.ForeignKey("blog_post.post_id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "tag_id",
+            sa.Integer,
+            sa.ForeignKey("tag.tag_id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("post_id", "tag_id"),
+    )
+    # Keyset pagination of a tag's posts is a range scan on this index.
+    op.create_index("ix_post_tag_tag_id_post_id", "post_tag", ["tag_id", "post_id"])
+
+
+def create_tag_post_count_trigger() -> None:
+    """Keep tag.post_count in step with post_tag."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION update_tag_post_count()
+            RETURNS TRIGGER AS
+        $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE tag SET post_count = post_count + 1 WHERE tag_id = NEW.tag_id;
+                RETURN NEW;
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE tag SET post_count = GREATEST(post_count - 1, 0)
+                WHERE tag_id = OLD.tag_id;
+                RETURN OLD;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql';
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER update_post_tag_count
+            AFTER INSERT OR DELETE
+            ON post_tag
+            FOR EACH ROW
+        EXECUTE PROCEDURE update_tag_post_count()
+        """
+    )
+
+
+def upgrade() -> None:
+    """Upgrade DB"""
+    create_tag_table()
+    create_post_tag_table()
+    create_tag_post_count_trigger()
+
+
+def downgrade() -> None:
+    """Downgrade DB"""
+    op.drop_table("post_tag")
+    op.execute("DROP FUNCTION IF EXISTS update_tag_post_count")
+    op.drop_table("tag")
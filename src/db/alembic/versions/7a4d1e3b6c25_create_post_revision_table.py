@@ -0,0 +1,51 @@
+"""create post revision table
+
+Revision ID: 7a4d1e3b6c25
+Revises: 5e2b7c8d9f01
+Create Date: 2023-02-02 09:47:13.552108
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7a4d1e3b6c25"
+down_revision = "5e2b7c8d9f01"
+branch_labels = None
+depends_on = None
+
+
+def create_post_revision_table() -> None:
+    """Create Post Revision Table"""
+    op.create_table(
+        "post_revision",
+        sa.Column(
+            "post_id",
+            sa.Integer,
+            sa.ForeignKey("blog_post.post_id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("revision", sa.Integer, nullable=False),
+        sa.Column("is_snapshot", sa.Boolean, nullable=False),
+        sa.Column("title", sa.String, nullable=False),
+        # Full content for snapshots, a JSON line delta otherwise.
+        sa.Column("content_delta", sa.Text, nullable=False),
+        sa.Column("editor_username", sa.String, nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("post_id", "revision"),
+    )
+
+
+def upgrade() -> None:
+    """Upgrade DB"""
+    create_post_revision_table()
+
+
+def downgrade() -> None:
+    """Downgrade DB"""
+    op.drop_table("post_revision")
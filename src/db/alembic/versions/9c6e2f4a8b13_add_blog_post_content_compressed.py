@@ -0,0 +1,144 @@
+"""add blog post content compressed
+
+Revision ID: 9c6e2f4a8b13
+Revises: 7a4d1e3b6c25
+Create Date: 2023-02-11 14:20:05.117846
+
+Existing large posts are compressed in committed post_id batches when the
+threshold is passed, e.g.
+alembic -x compress_content_threshold_bytes=16384 upgrade head
+Otherwise run `python -m src.db.compress_content` after enabling compression.
+
+update_updated_at_column leaves updated_at alone in sessions that set
+blog.keep_updated_at, so storage-only rewrites keep the edit time.
+
+Self-contained: the blob format and queries are copied here so the
+revision does not change with the app code.
+"""
+import time
+import zlib
+
+import sqlalchemy as sa
+from alembic import context, op
+
+# revision identifiers, used by Alembic.
+revision = "9c6e2f4a8b13"
+down_revision = "7a4d1e3b6c25"
+branch_labels = None
+depends_on = None
+
+# Blob format of this revision: codec byte, then the zlib stream.
+CODEC_ZLIB = b"\x01"
+COMPRESSION_LEVEL = 6
+
+GET_UNCOMPRESSED_POSTS_QUERY = """
+    SELECT post_id, content, updated_at FROM blog_post
+    WHERE post_id > :last_post_id
+      AND content_compressed IS NULL
+      AND octet_length(content) >= :threshold
+    ORDER BY post_id
+    LIMIT :batch_size;
+"""
+
+# Skips updated_at for sessions running storage-only rewrites.
+KEEP_UPDATED_AT_FUNCTION = """
+    CREATE OR REPLACE FUNCTION update_updated_at_column()
+        RETURNS TRIGGER AS
+    $$
+    BEGIN
+        IF current_setting('blog.keep_updated_at', true) = 'on' THEN
+            RETURN NEW;
+        END IF;
+        NEW.updated_at = now();
+        RETURN NEW;
+    END;
+    $$ language 'plpgsql';
+"""
+
+UPDATED_AT_FUNCTION = """
+    CREATE OR REPLACE FUNCTION update_updated_at_column()
+        RETURNS TRIGGER AS
+    $$
+    BEGIN
+        NEW.updated_at = now();
+        RETURN NEW;
+    END;
+    $$ language 'plpgsql';
+"""
+
+COMPRESS_POST_QUERY = """
+    UPDATE blog_post SET content = NULL, content_compressed = :blob
+    WHERE post_id = :post_id AND updated_at = :updated_at AND content_compressed IS NULL;
+"""
+
+
+def compress_existing_content(threshold: int, batch_size: int = 500) -> None:
+    """Compress posts of at least threshold bytes, committing each batch."""
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        connection.execute(sa.text("SET blog.keep_updated_at = on"))
+        last_post_id = 0
+        while True:
+            rows = connection.execute(
+                sa.text(GET_UNCOMPRESSED_POSTS_QUERY),
+                {
+                    "last_post_id": last_post_id,
+                    "threshold": threshold,
+                    "batch_size": batch_size,
+                },
+            ).fetchall()
+            if not rows:
+                break
+            for post_id, content, updated_at in rows:
+                encoded = content.encode()
+                blob = CODEC_ZLIB + zlib.compress(encoded, COMPRESSION_LEVEL)
+                if len(blob) >= len(encoded):
+                    continue
+                connection.execute(
+                    sa.text(COMPRESS_POST_QUERY),
+                    {"blob": blob, "post_id": post_id, "updated_at": updated_at},
+                )
+            last_post_id = rows[-1][0]
+            print(f"Compressed posts up to post_id {last_post_id}")
+            time.sleep(0.1)
+        connection.execute(sa.text("RESET blog.keep_updated_at"))
+
+
+def restore_compressed_content() -> None:
+    """Write compressed posts back to the content column."""
+    connection = op.get_bind()
+    connection.execute(sa.text("SET LOCAL blog.keep_updated_at = on"))
+    rows = connection.execute(
+        sa.text(
+            "SELECT post_id, content_compressed FROM blog_post "
+            "WHERE content_compressed IS NOT NULL"
+        )
+    )
+    for post_id, blob in rows.fetchall():
+        blob = bytes(blob)
+        if blob[:1] != CODEC_ZLIB:
+            raise ValueError(f"Unknown content codec {blob[:1]!r} in post {post_id}")
+        connection.execute(
+            sa.text("UPDATE blog_post SET content = :content WHERE post_id = :post_id"),
+            {"content": zlib.decompress(blob[1:]).decode(), "post_id": post_id},
+        )
+
+
+def upgrade() -> None:
+    """Upgrade DB"""
+    op.add_column(
+        "blog_post", sa.Column("content_compressed", sa.LargeBinary, nullable=True)
+    )
+    op.execute(KEEP_UPDATED_AT_FUNCTION)
+    threshold = context.get_x_argument(as_dictionary=True).get(
+        "compress_content_threshold_bytes"
+    )
+    if threshold:
+        compress_existing_content(int(threshold))
+
+
+def downgrade() -> None:
+    """Downgrade DB"""
+    restore_compressed_content()
+    op.drop_column("blog_post", "content_compressed")
+    op.execute(UPDATED_AT_FUNCTION)
@@ -0,0 +1,27 @@
+"""add blog post created at index
+
+Revision ID: b8d3f1a6c4e2
+Revises: 9c6e2f4a8b13
+Create Date: 2023-02-25 11:32:48.604291
+
+"""
+from src.db.online_migrations import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision = "b8d3f1a6c4e2"
+down_revision = "9c6e2f4a8b13"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade DB"""
+    # Keyset pagination of recent posts.
+    create_index_concurrently(
+        "ix_blog_post_created_at_post_id", "blog_post", ["created_at", "post_id"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade DB"""
+    drop_index_concurrently("ix_blog_post_created_at_post_id")
@@ -0,0 +1,326 @@
+"""partition blog post by month
+
+Revision ID: e5a9c7b2d1f4
+Revises: b8d3f1a6c4e2
+Create Date: 2023-03-04 17:05:26.881930
+
+Opt-in: only changes the schema when BLOG_POST_PARTITIONED is set.
+
+Rows are copied into a table range-partitioned on created_at in resumable
+batches while blog_post stays online. Writes are then blocked briefly to
+copy the rows inserted, updated or deleted meanwhile and to swap the tables.
+The old table is kept as blog_post_unpartitioned until dropped by hand.
+
+The app and the downgrade check the actual schema, not BLOG_POST_PARTITIONED,
+so a database migrated without the flag keeps working if it is set later;
+the app warns that the flag has no effect then.
+
+There is no DEFAULT partition: a month with rows in it could not be added
+later. Monthly partitions cover the oldest post onwards and the app keeps
+BLOG_POST_PARTITION_MONTHS_AHEAD months ahead of now.
+
+Only queries bounded on created_at, such as the recent listing, prune
+partitions. Lookups by post_id (get, update, delete, and the tag and feed
+joins) probe the post_id index of every partition; see
+benchmarks/post_lookups.py.
+
+A unique constraint on a partitioned table must include the partition key,
+so post_tag and post_revision lose their foreign keys to blog_post. A
+trigger deletes their rows when a post is deleted instead.
+"""
+import sqlalchemy as sa
+from alembic import op
+
+from src.core.config import BLOG_POST_PARTITION_MONTHS_AHEAD, BLOG_POST_PARTITIONED
+from src.db.online_migrations import batched_copy
+
+# revision identifiers, used by Alembic.
+revision = "e5a9c7b2d1f4"
+down_revision = "b8d3f1a6c4e2"
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    "post_id",
+    "title",
+    "content",
+    "content_compressed",
+    "user_uuid",
+    "user_username",
+    "created_at",
+    "updated_at",
+]
+
+# (name on the partitioned table while copying, final name, columns)
+INDEXES = [
+    (
+        "blog_post_partitioned_user_uuid_created_at_idx",
+        "ix_blog_post_user_uuid_created_at",
+        "user_uuid, created_at",
+    ),
+    (
+        "blog_post_partitioned_created_at_post_id_idx",
+        "ix_blog_post_created_at_post_id",
+        "created_at, post_id",
+    ),
+]
+
+
+def create_partition_function() -> None:
+    """Function creating monthly partitions up to months_ahead from now."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION create_blog_post_partitions(
+            parent TEXT, from_date TIMESTAMPTZ, months_ahead INTEGER
+        )
+            RETURNS INTEGER AS
+        $$
+        DECLARE
+            month_start TIMESTAMPTZ := date_trunc('month', from_date);
+            last_month TIMESTAMPTZ := date_trunc('month', now())
+                + make_interval(months => months_ahead);
+            partition_name TEXT;
+            created INTEGER := 0;
+        BEGIN
+            -- Workers run this concurrently at startup.
+            PERFORM pg_advisory_xact_lock(hashtext('create_blog_post_partitions'));
+            WHILE month_start <= last_month LOOP
+                partition_name := 'blog_post_p' || to_char(month_start, 'YYYY_MM');
+                IF to_regclass(partition_name) IS NULL THEN
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                        partition_name, parent,
+                        month_start, month_start + interval '1 month'
+                    );
+                    created := created + 1;
+                END IF;
+                month_start := month_start + interval '1 month';
+            END LOOP;
+            RETURN created;
+        END;
+        $$ language 'plpgsql';
+        """
+    )
+
+
+def create_partitioned_table() -> None:
+    """Create the partitioned copy of blog_post with its partitions and indexes."""
+    op.execute(
+        """
+        CREATE TABLE blog_post_partitioned (
+            post_id INTEGER NOT NULL DEFAULT nextval('blog_post_post_id_seq'),
+            title VARCHAR NOT NULL,
+            content TEXT,
+            content_compressed BYTEA,
+            user_uuid VARCHAR NOT NULL REFERENCES users (uuid) ON DELETE CASCADE,
+            user_username VARCHAR NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (post_id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute(
+        sa.text(
+            "SELECT create_blog_post_partitions('blog_post_partitioned', "
+            "COALESCE((SELECT min(created_at) FROM blog_post), now()), :months_ahead)"
+        ).bindparams(months_ahead=BLOG_POST_PARTITION_MONTHS_AHEAD)
+    )
+    for copy_name, _, columns in INDEXES:
+        op.execute(f"CREATE INDEX {copy_name} ON blog_post_partitioned ({columns})")
+
+
+def create_delete_children_trigger() -> None:
+    """Replace the post_tag and post_revision cascades on blog_post."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION delete_blog_post_children()
+            RETURNS TRIGGER AS
+        $$
+        BEGIN
+            DELETE FROM post_tag WHERE post_id = OLD.post_id;
+            DELETE FROM post_revision WHERE post_id = OLD.post_id;
+            RETURN OLD;
+        END;
+        $$ language 'plpgsql';
+        """
+    )
+
+
+def create_blog_post_triggers() -> None:
+    """Attach the blog_post triggers to the current blog_post table."""
+    op.execute(
+        """
+        CREATE TRIGGER update_blog_post_time
+            BEFORE UPDATE
+            ON blog_post
+            FOR EACH ROW
+        EXECUTE PROCEDURE update_updated_at_column()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER update_blog_post_author_stats
+            AFTER INSERT OR DELETE
+            ON blog_post
+            FOR EACH ROW
+        EXECUTE PROCEDURE update_author_stats_on_post()
+        """
+    )
+
+
+def drop_blog_post_triggers() -> None:
+    """Detach the blog_post triggers before swapping tables."""
+    op.execute("DROP TRIGGER IF EXISTS update_blog_post_time ON blog_post")
+    op.execute("DROP TRIGGER IF EXISTS update_blog_post_author_stats ON blog_post")
+    op.execute("DROP TRIGGER IF EXISTS delete_blog_post_children ON blog_post")
+
+
+def catch_up() -> None:
+    """Apply writes made to blog_post since the batched copy read them.
+
+    Runs with writes blocked. Inserts are found by anti-join rather than by
+    post_id, since an id allocated before the copy can commit after it.
+    """
+    op.execute(
+        """
+        INSERT INTO blog_post_partitioned (
+            post_id, title, content, content_compressed, user_uuid, user_username,
+            created_at, updated_at
+        )
+        SELECT s.post_id, s.title, s.content, s.content_compressed, s.user_uuid,
+               s.user_username, s.created_at, s.updated_at
+        FROM blog_post AS s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM blog_post_partitioned AS t WHERE t.post_id = s.post_id
+        )
+        """
+    )
+    op.execute(
+        """
+        UPDATE blog_post_partitioned AS t
+        SET title = s.title, content = s.content,
+            content_compressed = s.content_compressed, updated_at = s.updated_at
+        FROM blog_post AS s
+        WHERE s.post_id = t.post_id AND s.updated_at > t.updated_at
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM blog_post_partitioned AS t
+        WHERE NOT EXISTS (SELECT 1 FROM blog_post AS s WHERE s.post_id = t.post_id)
+        """
+    )
+
+
+def upgrade() -> None:
+    """Upgrade DB"""
+    if not BLOG_POST_PARTITIONED:
+        print(
+            "BLOG_POST_PARTITIONED is not set: blog_post stays unpartitioned, "
+            "and setting the flag after this revision has no effect"
+        )
+        return
+    create_partition_function()
+    create_partitioned_table()
+    create_delete_children_trigger()
+
+    batched_copy(
+        "partition_blog_post",
+        source="blog_post",
+        target="blog_post_partitioned",
+        key_column="post_id",
+        columns=COLUMNS,
+    )
+
+    # Reads continue; writes wait for the rest of this transaction.
+    op.execute("LOCK TABLE blog_post IN SHARE ROW EXCLUSIVE MODE")
+    catch_up()
+    op.execute("ALTER TABLE post_tag DROP CONSTRAINT post_tag_post_id_fkey")
+    op.execute("ALTER TABLE post_revision DROP CONSTRAINT post_revision_post_id_fkey")
+    drop_blog_post_triggers()
+    op.execute("ALTER TABLE blog_post RENAME TO blog_post_unpartitioned")
+    for _, final_name, _ in INDEXES:
+        op.execute(f"ALTER INDEX {final_name} RENAME TO {final_name}_unpartitioned")
+    op.execute("ALTER TABLE blog_post_partitioned RENAME TO blog_post")
+    for copy_name, final_name, _ in INDEXES:
+        op.execute(f"ALTER INDEX {copy_name} RENAME TO {final_name}")
+    op.execute("ALTER SEQUENCE blog_post_post_id_seq OWNED BY blog_post.post_id")
+    create_blog_post_triggers()
+    op.execute(
+        """
+        CREATE TRIGGER delete_blog_post_children
+            AFTER DELETE
+            ON blog_post
+            FOR EACH ROW
+        EXECUTE PROCEDURE delete_blog_post_children()
+        """
+    )
+
+
+def is_partitioned() -> bool:
+    """Whether blog_post is partitioned, whatever the flag says now."""
+    return bool(
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass('blog_post'))"
+            )
+        )
+        .scalar()
+    )
+
+
+def downgrade() -> None:
+    """Downgrade DB"""
+    if not is_partitioned():
+        return
+    op.execute("LOCK TABLE blog_post IN SHARE ROW EXCLUSIVE MODE")
+    op.execute("DROP TABLE IF EXISTS blog_post_unpartitioned")
+    op.execute(
+        """
+        CREATE TABLE blog_post_unpartitioned (
+            post_id INTEGER PRIMARY KEY DEFAULT nextval('blog_post_post_id_seq'),
+            title VARCHAR NOT NULL,
+            content TEXT,
+            content_compressed BYTEA,
+            user_uuid VARCHAR NOT NULL REFERENCES users (uuid) ON DELETE CASCADE,
+            user_username VARCHAR NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO blog_post_unpartitioned (
+            post_id, title, content, content_compressed, user_uuid, user_username,
+            created_at, updated_at
+        )
+        SELECT post_id, title, content, content_compressed, user_uuid, user_username,
+               created_at, updated_at
+        FROM blog_post
+        """
+    )
+    drop_blog_post_triggers()
+    op.execute("ALTER TABLE blog_post RENAME TO blog_post_partitioned")
+    for _, final_name, _ in INDEXES:
+        op.execute(f"ALTER INDEX {final_name} RENAME TO {final_name}_partitioned")
+    op.execute("ALTER TABLE blog_post_unpartitioned RENAME TO blog_post")
+    op.execute("ALTER SEQUENCE blog_post_post_id_seq OWNED BY blog_post.post_id")
+    for _, final_name, columns in INDEXES:
+        op.execute(f"CREATE INDEX {final_name} ON blog_post ({columns})")
+    create_blog_post_triggers()
+    op.execute("DROP TABLE blog_post_partitioned")
+    op.execute(
+        "ALTER TABLE post_tag ADD CONSTRAINT post_tag_post_id_fkey "
+        "FOREIGN KEY (post_id) REFERENCES blog_post (post_id) ON DELETE CASCADE"
+    )
+    op.execute(
+        "ALTER TABLE post_revision ADD CONSTRAINT post_revision_post_id_fkey "
+        "FOREIGN KEY (post_id) REFERENCES blog_post (post_id) ON DELETE CASCADE"
+    )
+    op.execute("DROP FUNCTION IF EXISTS delete_blog_post_children")
+    op.execute("DROP FUNCTION IF EXISTS create_blog_post_partitions")
+    op.execute("DELETE FROM migration_backfill_progress WHERE name = 'partition_blog_post'")
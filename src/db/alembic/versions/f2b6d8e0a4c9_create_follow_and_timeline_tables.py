@@ -0,0 +1,119 @@
+"""create follow and timeline tables
+
+Revision ID: f2b6d8e0a4c9
+Revises: e5a9c7b2d1f4
+Create Date: 2023-03-18 12:41:09.275513
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f2b6d8e0a4c9"
+down_revision = "e5a9c7b2d1f4"
+branch_labels = None
+depends_on = None
+
+
+def create_follow_table() -> None:
+    """Create Follow Table"""
+    op.create_table(
+        "follow",
+        sa.Column(
+            "follower_uuid",
+            sa.String,
+            sa.ForeignKey("users.uuid", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "followee_uuid",
+            sa.String,
+            sa.ForeignKey("users.uuid", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("follower_uuid", "followee_uuid"),
+    )
+    # Fan-out on write reads an author's followers.
+    op.create_index(
+        "ix_follow_followee_uuid_follower_uuid", "follow", ["followee_uuid", "follower_uuid"]
+    )
+
+
+def create_timeline_table() -> None:
+    """Create Timeline Table"""
+    op.create_table(
+        "timeline",
+        sa.Column(
+            "user_uuid",
+            sa.String,
+            sa.ForeignKey("users.uuid", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        # No foreign key: blog_post may be partitioned. Rows are removed when
+        # their post is deleted, and feed reads join blog_post anyway.
+        sa.Column("post_id", sa.Integer, nullable=False),
+        sa.Column("author_uuid", sa.String, nullable=False),
+        # Feed pages are a backward range scan of the primary key.
+        sa.PrimaryKeyConstraint("user_uuid", "post_id"),
+    )
+    op.create_index("ix_timeline_post_id", "timeline", ["post_id"])
+
+
+def create_follower_count() -> None:
+    """Keep author_stats.follower_count in step with follow."""
+    op.add_column(
+        "author_stats",
+        sa.Column("follower_count", sa.Integer, nullable=False, server_default="0"),
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION update_author_stats_on_follow()
+            RETURNS TRIGGER AS
+        $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO author_stats (user_uuid, follower_count)
+                VALUES (NEW.followee_uuid, 1)
+                ON CONFLICT (user_uuid) DO UPDATE
+                SET follower_count = author_stats.follower_count + 1;
+                RETURN NEW;
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE author_stats SET follower_count = GREATEST(follower_count - 1, 0)
+                WHERE user_uuid = OLD.followee_uuid;
+                RETURN OLD;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql';
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER update_follow_author_stats
+            AFTER INSERT OR DELETE
+            ON follow
+            FOR EACH ROW
+        EXECUTE PROCEDURE update_author_stats_on_follow()
+        """
+    )
+
+
+def upgrade() -> None:
+    """Upgrade DB"""
+    create_follow_table()
+    create_timeline_table()
+    create_follower_count()
+
+
+def downgrade() -> None:
+    """Downgrade DB"""
+    op.drop_table("timeline")
+    op.drop_table("follow")
+    op.execute("DROP FUNCTION IF EXISTS update_author_stats_on_follow")
+    op.drop_column("author_stats", "follower_count")
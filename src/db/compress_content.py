@@ -0,0 +1,105 @@
+"""Compress existing large blog posts.
+
+Usage: python -m src.db.compress_content --batch-size 500
+
+New and edited posts are compressed when written. Run this after turning
+CONTENT_COMPRESSION_ENABLED on, or lowering the threshold, to compress
+posts stored before. Each post_id batch commits on its own, so it can be
+stopped and re-run at any time. Compressing is a storage change, so the
+session sets blog.keep_updated_at and posts keep their updated_at.
+"""
+
+# Standard library imports
+import argparse
+import time
+
+# Third party imports
+import sqlalchemy as sa
+from sqlalchemy.engine import Connection
+
+from src.core.config import (
+    CONTENT_COMPRESSION_ENABLED,
+    CONTENT_COMPRESSION_THRESHOLD_BYTES,
+    DATABASE_URL,
+)
+from src.services.compression import split_content
+
+GET_UNCOMPRESSED_POSTS_QUERY = """
+    SELECT post_id, content, updated_at FROM blog_post
+    WHERE post_id > :last_post_id
+      AND content_compressed IS NULL
+      AND octet_length(content) >= :threshold
+    ORDER BY post_id
+    LIMIT :batch_size;
+"""
+
+KEEP_UPDATED_AT_QUERY = """
+    SET blog.keep_updated_at = on;
+"""
+
+# Skips posts edited since they were read.
+COMPRESS_POST_QUERY = """
+    UPDATE blog_post SET content = NULL, content_compressed = :blob
+    WHERE post_id = :post_id AND updated_at = :updated_at AND content_compressed IS NULL;
+"""
+
+
+def compress_existing_content(
+    connection: Connection, *, batch_size: int = 500, pause_seconds: float = 0.1
+) -> int:
+    """Compress uncompressed posts above the threshold, returning how many.
+
+    connection must be in autocommit mode so each update commits on its own.
+    """
+    if not CONTENT_COMPRESSION_ENABLED:
+        return 0
+    connection.execute(sa.text(KEEP_UPDATED_AT_QUERY))
+    compressed = 0
+    last_post_id = 0
+    while True:
+        rows = connection.execute(
+            sa.text(GET_UNCOMPRESSED_POSTS_QUERY),
+            {
+                "last_post_id": last_post_id,
+                "threshold": CONTENT_COMPRESSION_THRESHOLD_BYTES,
+                "batch_size": batch_size,
+            },
+        ).fetchall()
+        if not rows:
+            return compressed
+        for post_id, content, updated_at in rows:
+            _, content_compressed = split_content(content)
+            if content_compressed is None:
+                continue
+            result = connection.execute(
+                sa.text(COMPRESS_POST_QUERY),
+                {
+                    "blob": content_compressed,
+                    "post_id": post_id,
+                    "updated_at": updated_at,
+                },
+            )
+            compressed += result.rowcount
+        last_post_id = rows[-1][0]
+        print(f"Compressed {compressed} posts up to post_id {last_post_id}")
+        time.sleep(pause_seconds)
+
+
+def main() -> None:
+    """Run the backfill from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--pause-seconds", type=float, default=0.1)
+    args = parser.parse_args()
+    if not CONTENT_COMPRESSION_ENABLED:
+        parser.error("CONTENT_COMPRESSION_ENABLED is not set")
+    engine = sa.create_engine(str(DATABASE_URL), isolation_level="AUTOCOMMIT")
+    with engine.connect() as connection:
+        compressed = compress_existing_content(
+            connection, batch_size=args.batch_size, pause_seconds=args.pause_seconds
+        )
+    print(f"Done, compressed {compressed} posts")
+
+
+if __name__ == "__main__":
+    main()
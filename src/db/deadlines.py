@@ -0,0 +1,131 @@
+"""Request deadlines applied to database calls."""
+
+# Standard library imports
+import asyncio
+import sys
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Awaitable, Dict, Optional
+
+# Third party imports
+from databases import Database
+
+# Monotonic time by which the current request must finish, if any.
+request_deadline: ContextVar[Optional[float]] = ContextVar(
+    "request_deadline", default=None
+)
+
+
+class DeadlineExceededError(Exception):
+    """The request deadline passed before a database call finished."""
+
+    pass
+
+
+def remaining_seconds() -> Optional[float]:
+    """Seconds left before the current request's deadline, None if unbounded."""
+    deadline = request_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+class QueryTimeouts:
+    """Count deadline expiries per repository query constant."""
+
+    def __init__(self) -> None:
+        """Initialize counters."""
+        self.counts: Counter = Counter()
+        self._names: Dict[str, str] = {}
+
+    def record(self, query: Any) -> None:
+        """Count a timeout for query."""
+        self.counts[self.query_name(query)] += 1
+
+    def query_name(self, query: Any) -> str:
+        """Name of the repository constant holding query, or the query itself."""
+        if not isinstance(query, str):
+            return str(query)
+        if query not in self._names:
+            for module_name, module in list(sys.modules.items()):
+                if not module_name.startswith("src.db.repositories"):
+                    continue
+                for name, value in vars(module).items():
+                    if name.isupper() and isinstance(value, str):
+                        self._names.setdefault(value, name)
+        return self._names.get(query, query.strip())
+
+    def stats(self) -> Dict[str, int]:
+        """Timeouts per query name."""
+        return dict(self.counts)
+
+
+query_timeouts = QueryTimeouts()
+
+
+async def run_with_deadline(query: Any, call: Awaitable) -> Any:
+    """Await a database call, cancelling it when the request deadline passes.
+
+    Cancelling an asyncpg query sends a cancel request to Postgres, so the
+    statement stops server-side and its pool connection is released. The
+    bound covers waiting for a pool connection as well as the query itself.
+    The call runs in the current task (unlike asyncio.wait_for) so it keeps
+    using the task's connection inside a transaction.
+    """
+    remaining = remaining_seconds()
+    if remaining is None:
+        return await call
+    if remaining <= 0:
+        call.close()  # type: ignore
+        query_timeouts.record(query)
+        raise DeadlineExceededError()
+
+    task = asyncio.current_task()
+    expired = False
+
+    def expire() -> None:
+        nonlocal expired
+        expired = True
+        task.cancel()  # type: ignore
+
+    handle = asyncio.get_running_loop().call_later(remaining, expire)
+    try:
+        return await call
+    except asyncio.CancelledError:
+        if not expired:
+            raise
+        if hasattr(task, "uncancel"):
+            task.uncancel()  # type: ignore
+        query_timeouts.record(query)
+        raise DeadlineExceededError()
+    finally:
+        handle.cancel()
+
+
+class DeadlineDatabase(Database):
+    """Database whose queries are bounded by the current request deadline."""
+
+    async def fetch_all(self, query: Any, values: Optional[dict] = None) -> Any:
+        """Run fetch_all within the request deadline."""
+        return await run_with_deadline(query, super().fetch_all(query, values))
+
+    async def fetch_one(self, query: Any, values: Optional[dict] = None) -> Any:
+        """Run fetch_one within the request deadline."""
+        return await run_with_deadline(query, super().fetch_one(query, values))
+
+    async def fetch_val(
+        self, query: Any, values: Optional[dict] = None, column: Any = 0
+    ) -> Any:
+        """Run fetch_val within the request deadline."""
+        return await run_with_deadline(
+            query, super().fetch_val(query, values, column=column)
+        )
+
+    async def execute(self, query: Any, values: Optional[dict] = None) -> Any:
+        """Run execute within the request deadline."""
+        return await run_with_deadline(query, super().execute(query, values))
+
+    async def execute_many(self, query: Any, values: list) -> None:
+        """Run execute_many within the request deadline."""
+        return await run_with_deadline(query, super().execute_many(query, values))
@@ -0,0 +1,382 @@
+"""Helpers for migrations that must not block a busy table.
+
+Conventions for revisions touching large tables (blog_post, post_tag, ...):
+
+* Create and drop indexes with create_index_concurrently and
+  drop_index_concurrently, never op.create_index or index=True.
+* Add columns nullable and without a volatile default through
+  execute_with_lock_timeout, so a long-running query holding a lock makes
+  the migration retry instead of queueing every other query behind it.
+* Fill new columns with batched_backfill. Backfills must be idempotent:
+  a batch can be re-run after a crash before its progress was saved.
+* Keep each of these in its own revision, apart from regular DDL.
+
+All helpers run outside the migration transaction (CONCURRENTLY cannot run
+inside one, and each backfill batch commits on its own).
+
+Index, table and column names are quoted as identifiers. The set_clause
+and where fragments of batched_backfill, and the where predicate of
+create_index_concurrently, are SQL written in migration code and are
+inserted as given; never build them from outside input.
+"""
+
+# Standard library imports
+import time
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+# Third party imports
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.sql.elements import TextClause
+
+LOCK_TIMEOUT_MS = 2000
+LOCK_RETRY_ATTEMPTS = 10
+LOCK_RETRY_BACKOFF_SECONDS = 1.0
+
+# SQLSTATE raised when lock_timeout expires.
+LOCK_NOT_AVAILABLE = "55P03"
+
+CREATE_BACKFILL_PROGRESS_TABLE_QUERY = """
+    CREATE TABLE IF NOT EXISTS migration_backfill_progress (
+        name TEXT PRIMARY KEY,
+        last_key BIGINT NOT NULL,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+"""
+
+GET_BACKFILL_PROGRESS_QUERY = """
+    SELECT last_key FROM migration_backfill_progress WHERE name = :name;
+"""
+
+SAVE_BACKFILL_PROGRESS_QUERY = """
+    INSERT INTO migration_backfill_progress (name, last_key)
+    VALUES (:name, :last_key)
+    ON CONFLICT (name) DO UPDATE SET last_key = EXCLUDED.last_key, updated_at = now();
+"""
+
+GET_PARTITIONS_QUERY = """
+    SELECT nspname, relname
+    FROM pg_inherits
+    JOIN pg_partitioned_table ON partrelid = inhparent
+    JOIN pg_class ON pg_class.oid = inhrelid
+    JOIN pg_namespace ON pg_namespace.oid = relnamespace
+    WHERE inhparent = to_regclass(:table);
+"""
+
+IS_INDEX_ATTACHED_QUERY = """
+    SELECT EXISTS (SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(:name));
+"""
+
+IS_PARTITIONED_INDEX_QUERY = """
+    SELECT relkind = 'I' FROM pg_class WHERE oid = to_regclass(:name);
+"""
+
+IS_INDEX_INVALID_QUERY = """
+    SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name);
+"""
+
+# Templates filled by _format_sql; {names} are quoted identifiers.
+CREATE_INDEX_CONCURRENTLY_QUERY = """
+    CREATE {kind} CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns}){where};
+"""
+
+CREATE_PARENT_INDEX_QUERY = """
+    CREATE {kind} IF NOT EXISTS {name} ON ONLY {table} ({columns}){where};
+"""
+
+ATTACH_PARTITION_INDEX_QUERY = """
+    ALTER INDEX {name} ATTACH PARTITION {partition_index};
+"""
+
+DROP_INDEX_CONCURRENTLY_QUERY = """
+    DROP INDEX CONCURRENTLY IF EXISTS {name};
+"""
+
+DROP_INDEX_QUERY = """
+    DROP INDEX IF EXISTS {name};
+"""
+
+GET_FIRST_KEY_QUERY = """
+    SELECT min({key_column}) - 1 FROM {table};
+"""
+
+GET_BATCH_END_QUERY = """
+    SELECT max({key_column}) FROM (
+        SELECT {key_column} FROM {table} WHERE {key_column} > :last_key
+        ORDER BY {key_column} LIMIT :batch_size
+    ) AS batch;
+"""
+
+BACKFILL_BATCH_QUERY = """
+    UPDATE {table} SET {set_clause}
+    WHERE {key_column} > :last_key AND {key_column} <= :batch_end AND ({where});
+"""
+
+COPY_BATCH_QUERY = """
+    WITH batch AS (
+        INSERT INTO {target} ({columns})
+        SELECT {columns} FROM {source} WHERE {key_column} > :last_key
+        ORDER BY {key_column} LIMIT :batch_size
+        RETURNING {key_column}
+    )
+    SELECT max({key_column}) FROM batch;
+"""
+
+
+# A bare name, or (schema, name).
+Identifier = Union[str, Tuple[str, str]]
+
+
+def _quote(identifier: Identifier) -> str:
+    """Quote an identifier, schema-qualified when given as (schema, name)."""
+    preparer = op.get_bind().dialect.identifier_preparer
+    if isinstance(identifier, tuple):
+        schema, name = identifier
+        return f"{preparer.quote_schema(schema)}.{preparer.quote(name)}"
+    return preparer.quote(identifier)
+
+
+def _format_sql(
+    template: str,
+    *,
+    identifiers: Dict[str, Identifier],
+    column_lists: Optional[Dict[str, Sequence[str]]] = None,
+    fragments: Optional[Dict[str, str]] = None,
+) -> TextClause:
+    """Fill a query template, quoting identifiers; fragments are trusted SQL."""
+    values = {name: _quote(value) for name, value in identifiers.items()}
+    for name, columns in (column_lists or {}).items():
+        values[name] = ", ".join(_quote(column) for column in columns)
+    values.update(fragments or {})
+    return sa.text(template.format(**values))
+
+
+def _is_lock_timeout(error: OperationalError) -> bool:
+    return getattr(error.orig, "pgcode", None) == LOCK_NOT_AVAILABLE
+
+
+def execute_with_lock_timeout(
+    statement: str,
+    *,
+    lock_timeout_ms: int = LOCK_TIMEOUT_MS,
+    attempts: int = LOCK_RETRY_ATTEMPTS,
+    backoff_seconds: float = LOCK_RETRY_BACKOFF_SECONDS,
+) -> None:
+    """Run a DDL statement, giving up on its lock quickly and retrying."""
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        for attempt in range(1, attempts + 1):
+            connection.execute(sa.text(f"SET lock_timeout = '{int(lock_timeout_ms)}ms'"))
+            try:
+                connection.execute(sa.text(statement))
+                return
+            except OperationalError as e:
+                if not _is_lock_timeout(e) or attempt == attempts:
+                    raise
+                print(f"Lock timeout on attempt {attempt}, retrying: {statement}")
+                time.sleep(backoff_seconds * attempt)
+            finally:
+                connection.execute(sa.text("RESET lock_timeout"))
+
+
+def create_index_concurrently(
+    name: str,
+    table: str,
+    columns: Sequence[str],
+    *,
+    unique: bool = False,
+    where: Optional[str] = None,
+) -> None:
+    """CREATE INDEX CONCURRENTLY, replacing an invalid leftover of a failed run.
+
+    Partitioned tables cannot be indexed concurrently, so for them the index
+    is created on the parent only, built concurrently on each partition and
+    attached.
+    """
+    fragments = {
+        "kind": "UNIQUE INDEX" if unique else "INDEX",
+        "where": f" WHERE {where}" if where else "",
+    }
+    column_lists = {"columns": columns}
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        partitions = connection.execute(
+            sa.text(GET_PARTITIONS_QUERY), {"table": _quote(table)}
+        ).fetchall()
+        if not partitions:
+            _drop_invalid_index(name)
+            op.execute(
+                _format_sql(
+                    CREATE_INDEX_CONCURRENTLY_QUERY,
+                    identifiers={"name": name, "table": table},
+                    column_lists=column_lists,
+                    fragments=fragments,
+                )
+            )
+            return
+
+        op.execute(
+            _format_sql(
+                CREATE_PARENT_INDEX_QUERY,
+                identifiers={"name": name, "table": table},
+                column_lists=column_lists,
+                fragments=fragments,
+            )
+        )
+        for schema, partition in partitions:
+            # Partition indexes live in the partition's schema.
+            partition_index = (schema, f"{partition}_{name}"[:63])
+            _drop_invalid_index(partition_index)
+            op.execute(
+                _format_sql(
+                    CREATE_INDEX_CONCURRENTLY_QUERY,
+                    identifiers={
+                        "name": partition_index[1],
+                        "table": (schema, partition),
+                    },
+                    column_lists=column_lists,
+                    fragments=fragments,
+                )
+            )
+            attached = connection.execute(
+                sa.text(IS_INDEX_ATTACHED_QUERY), {"name": _quote(partition_index)}
+            ).scalar()
+            if not attached:
+                op.execute(
+                    _format_sql(
+                        ATTACH_PARTITION_INDEX_QUERY,
+                        identifiers={"name": name, "partition_index": partition_index},
+                    )
+                )
+
+
+def _drop_invalid_index(name: Identifier) -> None:
+    invalid = (
+        op.get_bind()
+        .execute(sa.text(IS_INDEX_INVALID_QUERY), {"name": _quote(name)})
+        .scalar()
+    )
+    if invalid:
+        op.execute(_format_sql(DROP_INDEX_CONCURRENTLY_QUERY, identifiers={"name": name}))
+
+
+def drop_index_concurrently(name: str) -> None:
+    """DROP INDEX CONCURRENTLY, or a plain DROP for a partitioned index."""
+    with op.get_context().autocommit_block():
+        partitioned = (
+            op.get_bind()
+            .execute(sa.text(IS_PARTITIONED_INDEX_QUERY), {"name": _quote(name)})
+            .scalar()
+        )
+        template = DROP_INDEX_QUERY if partitioned else DROP_INDEX_CONCURRENTLY_QUERY
+        op.execute(_format_sql(template, identifiers={"name": name}))
+
+
+def batched_backfill(
+    name: str,
+    *,
+    table: str,
+    key_column: str,
+    set_clause: str,
+    where: str = "TRUE",
+    batch_size: int = 1000,
+    pause_seconds: float = 0.1,
+) -> int:
+    """Update a table in key-ordered batches, each in its own transaction.
+
+    Progress is saved in migration_backfill_progress under `name`, so an
+    interrupted backfill resumes after the last finished batch. `where`
+    filters the rows to update within each batch; `pause_seconds` between
+    batches leaves room for replication and autovacuum. Returns the number
+    of rows updated.
+    """
+    updated = 0
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        connection.execute(sa.text(CREATE_BACKFILL_PROGRESS_TABLE_QUERY))
+        last_key = connection.execute(
+            sa.text(GET_BACKFILL_PROGRESS_QUERY), {"name": name}
+        ).scalar()
+        identifiers = {"table": table, "key_column": key_column}
+        if last_key is None:
+            last_key = connection.execute(
+                _format_sql(GET_FIRST_KEY_QUERY, identifiers=identifiers)
+            ).scalar()
+        if last_key is None:
+            return 0
+
+        get_batch_end = _format_sql(GET_BATCH_END_QUERY, identifiers=identifiers)
+        backfill_batch = _format_sql(
+            BACKFILL_BATCH_QUERY,
+            identifiers=identifiers,
+            fragments={"set_clause": set_clause, "where": where},
+        )
+        while True:
+            batch_end = connection.execute(
+                get_batch_end, {"last_key": last_key, "batch_size": batch_size}
+            ).scalar()
+            if batch_end is None:
+                return updated
+            result = connection.execute(
+                backfill_batch, {"last_key": last_key, "batch_end": batch_end}
+            )
+            updated += result.rowcount
+            last_key = batch_end
+            connection.execute(
+                sa.text(SAVE_BACKFILL_PROGRESS_QUERY),
+                {"name": name, "last_key": last_key},
+            )
+            time.sleep(pause_seconds)
+
+
+def batched_copy(
+    name: str,
+    *,
+    source: str,
+    target: str,
+    key_column: str,
+    columns: Sequence[str],
+    batch_size: int = 5000,
+    pause_seconds: float = 0.1,
+) -> Optional[int]:
+    """Copy rows between tables in key-ordered batches, resumably.
+
+    Like batched_backfill, progress is saved under `name` after each batch.
+    Rows written to source after their batch was copied are not picked up;
+    callers catch up under a lock before switching over. Returns the last
+    copied key, or None when source is empty.
+    """
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        connection.execute(sa.text(CREATE_BACKFILL_PROGRESS_TABLE_QUERY))
+        last_key = connection.execute(
+            sa.text(GET_BACKFILL_PROGRESS_QUERY), {"name": name}
+        ).scalar()
+        if last_key is None:
+            last_key = connection.execute(
+                _format_sql(
+                    GET_FIRST_KEY_QUERY,
+                    identifiers={"table": source, "key_column": key_column},
+                )
+            ).scalar()
+        if last_key is None:
+            return None
+
+        copy_batch = _format_sql(
+            COPY_BATCH_QUERY,
+            identifiers={"source": source, "target": target, "key_column": key_column},
+            column_lists={"columns": columns},
+        )
+        while True:
+            batch_end = connection.execute(
+                copy_batch, {"last_key": last_key, "batch_size": batch_size}
+            ).scalar()
+            if batch_end is None:
+                return last_key
+            last_key = batch_end
+            connection.execute(
+                sa.text(SAVE_BACKFILL_PROGRESS_QUERY),
+                {"name": name, "last_key": last_key},
+            )
+            time.sleep(pause_seconds)
@@ -0,0 +1,59 @@
+"""Prepared-statement fast path for hot repository queries."""
+
+# Standard library imports
+import re
+from typing import Any, Dict, List, Optional
+
+# Third party imports
+from databases import Database
+
+from src.db.deadlines import run_with_deadline
+
+# :name bindings, skipping :: casts.
+PARAM_PATTERN = re.compile(r"(?<![:\w]):([A-Za-z_]\w*)")
+
+
+class PreparedQuery:
+    """A repository query rewritten once to asyncpg's $n placeholders.
+
+    The databases library compiles every query through SQLAlchemy and wraps
+    rows in Record objects on each call. Running the rewritten SQL straight on
+    the pooled asyncpg connection skips both; asyncpg keeps the statement
+    prepared in each connection's statement cache, so Postgres parses and
+    plans it once per connection.
+    """
+
+    def __init__(self, query: str) -> None:
+        """Rewrite query and remember the order of its parameters."""
+        self.query = query
+        self.params: List[str] = []
+
+        def to_positional(match: "re.Match[str]") -> str:
+            name = match.group(1)
+            if name not in self.params:
+                self.params.append(name)
+            return f"${self.params.index(name) + 1}"
+
+        self.sql = PARAM_PATTERN.sub(to_positional, query)
+
+    def args(self, values: Dict[str, Any]) -> List[Any]:
+        """Positional arguments for values, ignoring unused keys."""
+        return [values[name] for name in self.params]
+
+
+async def fetch_one_prepared(
+    db: Database, query: PreparedQuery, values: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """Fetch one row as a dict through the prepared statement.
+
+    Uses the task's current connection, so it joins an open transaction.
+    """
+
+    async def fetch() -> Optional[Dict[str, Any]]:
+        async with db.connection() as connection:
+            row = await connection.raw_connection.fetchrow(
+                query.sql, *query.args(values)
+            )
+        return dict(row) if row is not None else None
+
+    return await run_with_deadline(query.query, fetch())
@@ -1,8 +1,98 @@
 """Base Repository."""
 
+# Standard library imports
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Union
+
 # Third party imports
 from databases import Database
 
+from src.db.deadlines import (
+    DeadlineExceededError,
+    query_timeouts,
+    remaining_seconds,
+    request_deadline,
+)
+from src.db.prepared import PreparedQuery, fetch_one_prepared
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent identical requests.
+
+    Only calls that overlap in time are coalesced; nothing is cached once
+    the shared call completes. The call runs in its own task without a
+    request deadline, so one caller's deadline or disconnect leaves it
+    running for the others; each caller waits for it up to its own
+    deadline, and it is cancelled once no caller is left.
+    """
+
+    def __init__(self) -> None:
+        """Initialize in-flight calls and counters."""
+        # key -> (shared task, number of callers awaiting it)
+        self._in_flight: Dict[Hashable, List[Any]] = {}
+        self.calls: Counter = Counter()
+        self.saved: Counter = Counter()
+
+    async def do(
+        self, *, name: str, key: Hashable, func: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Run func once for all concurrent callers with the same key."""
+        self.calls[name] += 1
+        entry = self._in_flight.get(key)
+        if entry is None or entry[0].done():
+            task = asyncio.ensure_future(self._run_without_deadline(func))
+            entry = self._in_flight[key] = [task, 0]
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.saved[name] += 1
+        task = entry[0]
+        entry[1] += 1
+        remaining = remaining_seconds()
+        try:
+            if remaining is None:
+                return await asyncio.shield(task)
+            return await asyncio.wait_for(asyncio.shield(task), max(remaining, 0))
+        except asyncio.TimeoutError:
+            self._leave(entry)
+            query_timeouts.record(name)
+            raise DeadlineExceededError()
+        except asyncio.CancelledError:
+            self._leave(entry)
+            raise
+
+    @staticmethod
+    async def _run_without_deadline(func: Callable[[], Awaitable[Any]]) -> Any:
+        """Await func in the task's own context copy, with no request deadline."""
+        request_deadline.set(None)
+        return await func()
+
+    @staticmethod
+    def _leave(entry: List[Any]) -> None:
+        """Stop waiting on a call, cancelling it if no caller is left."""
+        task = entry[0]
+        if not task.done():
+            entry[1] -= 1
+            if entry[1] == 0:
+                task.cancel()
+
+    def _forget(self, key: Hashable, task: "asyncio.Future[Any]") -> None:
+        """Drop a finished call, marking its failure as retrieved."""
+        if self._in_flight.get(key, [None])[0] is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Calls made and database calls saved per query name."""
+        return {
+            name: {"calls": self.calls[name], "saved": self.saved[name]}
+            for name in self.calls
+        }
+
+
+single_flight = SingleFlight()
+
 
 class BaseRepository:
     """Base class."""
@@ -10,3 +100,31 @@ class BaseRepository:
     def __init__(self, db: Database) -> None:
         """Initialize. db (Database): Initialize database"""
         self.db = db
+
+    async def fetch_one_prepared(
+        self, *, query: PreparedQuery, values: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """fetch_one through a cached prepared statement, as a dict."""
+        return await fetch_one_prepared(self.db, query, values)
+
+    async def fetch_one_coalesced(
+        self,
+        *,
+        name: str,
+        query: Union[str, PreparedQuery],
+        values: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        """fetch_one, sharing the result with concurrent identical calls."""
+        values = values or {}
+        key = (query, tuple(sorted(values.items())))
+        if isinstance(query, PreparedQuery):
+            return await single_flight.do(
+                name=name,
+                key=key,
+                func=lambda: self.fetch_one_prepared(query=query, values=values),
+            )
+        return await single_flight.do(
+            name=name,
+            key=key,
+            func=lambda: self.db.fetch_one(query=query, values=values),
+        )
@@ -1,46 +1,147 @@
 """DB repo for Blog Posts."""
 
 # Standard library imports
+import json
 import logging
 import uuid
-from typing import List, Union
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Mapping, Optional, Union, cast
 
 import asyncpg
 
 # Third party imports
 from databases import Database
+from databases.interfaces import Record
 
+from src.core.config import (
+    FANOUT_MAX_FOLLOWERS,
+    POST_EVENTS_BACKEND,
+    RECENT_POSTS_MAX_AGE_DAYS,
+)
+from src.db.prepared import PreparedQuery
 from src.db.repositories.base import BaseRepository
+from src.db.repositories.post_revision import PostRevisionRepository
 from src.models.blog_post import (
     BlogPostInDB,
     BlogPostPublic,
     CreateBlogPost,
     UpdateBlogPost,
 )
+from src.services.compression import inflate_row, split_content
+from src.services.post_events import (
+    POST_EVENTS_CHANNEL,
+    post_event_payload,
+    post_events,
+)
+
+# Max post_id, the keyset start when listing from the newest post.
+MAX_POST_ID = 2147483647
 
 CREATE_BLOG_POST_QUERY = """
-    INSERT INTO blog_post ( title, content, user_uuid, user_username)
-    VALUES ( :title, :content, :user_uuid, :user_username)
-    RETURNING post_id, title, content, user_uuid, user_username, created_at, updated_at;
+    INSERT INTO blog_post ( title, content, content_compressed, user_uuid, user_username)
+    VALUES ( :title, :content, :content_compressed, :user_uuid, :user_username)
+    RETURNING post_id, title, user_uuid, user_username, created_at, updated_at;
 """
 
 GET_BLOG_POST_BY_POST_ID_QUERY = """
-    SELECT post_id, title, content, user_uuid, user_username, created_at, updated_at
+    SELECT post_id, title, content, content_compressed, user_uuid, user_username,
+           created_at, updated_at,
+           ARRAY(
+               SELECT tag.name FROM post_tag JOIN tag ON tag.tag_id = post_tag.tag_id
+               WHERE post_tag.post_id = blog_post.post_id ORDER BY tag.name
+           ) AS tags
     FROM blog_post
     WHERE post_id = :post_id;
 """
 
+# Hot queries run as cached prepared statements.
+CREATE_BLOG_POST_PREPARED = PreparedQuery(CREATE_BLOG_POST_QUERY)
+GET_BLOG_POST_BY_POST_ID_PREPARED = PreparedQuery(GET_BLOG_POST_BY_POST_ID_QUERY)
+
+GET_BLOG_POSTS_BY_TAG_QUERY = """
+    SELECT blog_post.post_id, title, content, content_compressed, user_uuid, user_username,
+           created_at, updated_at,
+           ARRAY(
+               SELECT tag.name FROM post_tag AS pt JOIN tag ON tag.tag_id = pt.tag_id
+               WHERE pt.post_id = blog_post.post_id ORDER BY tag.name
+           ) AS tags
+    FROM post_tag
+    JOIN blog_post ON blog_post.post_id = post_tag.post_id
+    WHERE post_tag.tag_id = (SELECT tag_id FROM tag WHERE name = :tag)
+      AND post_tag.post_id < :before
+    ORDER BY post_tag.post_id DESC
+    LIMIT :limit;
+"""
+
+GET_POST_TAGS_QUERY = """
+    SELECT tag.name
+    FROM post_tag
+    JOIN tag ON tag.tag_id = post_tag.tag_id
+    WHERE post_tag.post_id = :post_id
+    ORDER BY tag.name;
+"""
+
+GET_TAG_COUNTS_QUERY = """
+    SELECT name, post_count
+    FROM tag
+    WHERE post_count > 0
+    ORDER BY post_count DESC, name DESC
+    LIMIT :limit;
+"""
+
+CREATE_TAGS_QUERY = """
+    INSERT INTO tag (name)
+    SELECT unnest(CAST(:names AS text[]))
+    ON CONFLICT (name) DO NOTHING;
+"""
+
+ASSIGN_POST_TAGS_QUERY = """
+    INSERT INTO post_tag (post_id, tag_id)
+    SELECT :post_id, tag_id
+    FROM tag
+    WHERE name = ANY(CAST(:names AS text[]))
+    ON CONFLICT DO NOTHING;
+"""
+
+UNASSIGN_OTHER_POST_TAGS_QUERY = """
+    DELETE FROM post_tag
+    USING tag
+    WHERE post_tag.post_id = :post_id
+      AND tag.tag_id = post_tag.tag_id
+      AND NOT tag.name = ANY(CAST(:names AS text[]));
+"""
+
+# The created_at bounds let the planner prune blog_post partitions.
+GET_RECENT_BLOG_POSTS_QUERY = """
+    SELECT post_id, title, content, content_compressed, user_uuid, user_username,
+           created_at, updated_at
+    FROM blog_post
+    WHERE created_at >= :since
+      AND created_at <= :before_created_at
+      AND (created_at, post_id) < (:before_created_at, :before_post_id)
+    ORDER BY created_at DESC, post_id DESC
+    LIMIT :limit;
+"""
+
 GET_ALL_BLOG_POSTS = """
-    SELECT *
+    SELECT post_id, title, content, content_compressed, user_uuid, user_username,
+           created_at, updated_at
     FROM blog_post
 """
 
 
+LOCK_BLOG_POST_FOR_UPDATE_QUERY = """
+    SELECT title, content, content_compressed, user_username, updated_at
+    FROM blog_post
+    WHERE post_id = :post_id
+    FOR UPDATE;
+"""
+
 UPDATE_BLOG_POST_BY_POST_ID_QUERY = """
     UPDATE blog_post
-    SET title = :title, content = :content
+    SET title = :title, content = :content, content_compressed = :content_compressed
     WHERE post_id = :post_id
-    RETURNING post_id, title, content, user_uuid, user_username, created_at, updated_at;
+    RETURNING post_id, title, user_uuid, user_username, created_at, updated_at;
 """
 
 DELETE_BLOG_POST_BY_POST_ID_QUERY = """
@@ -49,6 +150,56 @@ DELETE_BLOG_POST_BY_POST_ID_QUERY = """
     RETURNING post_id;
 """
 
+# Fan-out on write, skipped for authors with more than max_followers.
+# :author_uuid is only compared with varchar columns; selecting it too would
+# give the parameter two types and fail to prepare.
+FAN_OUT_BLOG_POST_QUERY = """
+    INSERT INTO timeline (user_uuid, post_id, author_uuid)
+    SELECT follower_uuid, :post_id, followee_uuid
+    FROM follow
+    WHERE followee_uuid = :author_uuid
+      AND (SELECT follower_count FROM author_stats WHERE user_uuid = :author_uuid)
+          <= :max_followers
+    ON CONFLICT DO NOTHING;
+"""
+
+# The user's precomputed timeline merged with the latest posts of followed
+# authors that are fanned out on read.
+GET_FEED_QUERY = """
+    WITH feed AS (
+        (
+            SELECT post_id FROM timeline
+            WHERE user_uuid = :user_uuid AND post_id < :before
+            ORDER BY post_id DESC
+            LIMIT :limit
+        )
+        UNION
+        (
+            SELECT recent.post_id
+            FROM follow
+            JOIN author_stats ON author_stats.user_uuid = follow.followee_uuid
+            CROSS JOIN LATERAL (
+                SELECT post_id FROM blog_post
+                WHERE blog_post.user_uuid = follow.followee_uuid AND post_id < :before
+                ORDER BY post_id DESC
+                LIMIT :limit
+            ) AS recent
+            WHERE follow.follower_uuid = :user_uuid
+              AND author_stats.follower_count > :max_followers
+        )
+    )
+    SELECT blog_post.post_id, title, content, content_compressed, user_uuid, user_username,
+           created_at, updated_at
+    FROM feed
+    JOIN blog_post ON blog_post.post_id = feed.post_id
+    ORDER BY blog_post.post_id DESC
+    LIMIT :limit;
+"""
+
+NOTIFY_POST_EVENT_QUERY = """
+    SELECT pg_notify(:channel, :payload);
+"""
+
 
 async def generate_uuid():
     """Generate uuid for user id."""
@@ -59,8 +210,9 @@ class BlogPostRepository(BaseRepository):
     """All db actions associated with the Users resources."""
 
     def __init__(self, db: Database) -> None:
-        """Initialize db, auth_path and profiles_repo."""
+        """Initialize db and revisions_repo."""
         super().__init__(db)
+        self.revisions_repo = PostRevisionRepository(db)
 
     async def create_new_blog_post(
         self, *, new_blog_post: CreateBlogPost, user_uuid: str, username: str
@@ -71,53 +223,236 @@ class BlogPostRepository(BaseRepository):
                 "user_username": username,
             }
         )
+        tags = new_blog_post.tags or []
+        content, content_compressed = split_content(new_blog_post.content)
         try:
-            created_blog_post = await self.db.fetch_one(
-                query=CREATE_BLOG_POST_QUERY, values=new_blog_post_params.dict()
-            )
+            async with self.db.transaction():
+                # INSERT ... RETURNING always returns the row.
+                created_blog_post = cast(
+                    Dict[str, Any],
+                    await self.fetch_one_prepared(
+                        query=CREATE_BLOG_POST_PREPARED,
+                        values={
+                            **new_blog_post_params.dict(exclude={"tags"}),
+                            "content": content,
+                            "content_compressed": content_compressed,
+                        },
+                    ),
+                )
+                if tags:
+                    await self.set_post_tags(
+                        post_id=created_blog_post["post_id"], tags=tags
+                    )
+                await self.db.execute(
+                    query=FAN_OUT_BLOG_POST_QUERY,
+                    values={
+                        "post_id": created_blog_post["post_id"],
+                        "author_uuid": user_uuid,
+                        "max_followers": FANOUT_MAX_FOLLOWERS,
+                    },
+                )
+                event = await self.notify_post_event(
+                    event="created", post=created_blog_post
+                )
         except asyncpg.ForeignKeyViolationError:
             return "The uuid passed is not present in users table"
-        return created_blog_post
+        self.publish_local_post_event(event)
+        return BlogPostInDB(
+            **created_blog_post, content=new_blog_post.content, tags=sorted(tags)
+        )
+
+    async def notify_post_event(self, *, event: str, post: Mapping[str, Any]) -> dict:
+        """Tell event subscribers in every worker that a post changed.
+
+        Runs inside the write's transaction: Postgres delivers the
+        notification on commit, and a failure rolls the write back instead of
+        failing a request whose write already committed. Returns the event
+        for publish_local_post_event.
+        """
+        payload = post_event_payload(event=event, post=post)
+        if POST_EVENTS_BACKEND == "postgres":
+            await self.db.execute(
+                query=NOTIFY_POST_EVENT_QUERY,
+                values={"channel": POST_EVENTS_CHANNEL, "payload": json.dumps(payload)},
+            )
+        return payload
+
+    def publish_local_post_event(self, payload: dict) -> None:
+        """Deliver an event after commit when events stay in this process."""
+        if POST_EVENTS_BACKEND != "postgres":
+            post_events.publish(payload)
+
+    async def set_post_tags(self, *, post_id: int, tags: List[str]) -> None:
+        """Replace the tags of a blog post, creating unknown tags."""
+        await self.db.execute(
+            query=UNASSIGN_OTHER_POST_TAGS_QUERY,
+            values={"post_id": post_id, "names": tags},
+        )
+        if not tags:
+            return
+        await self.db.execute(query=CREATE_TAGS_QUERY, values={"names": tags})
+        await self.db.execute(
+            query=ASSIGN_POST_TAGS_QUERY, values={"post_id": post_id, "names": tags}
+        )
+
+    async def get_post_tags(self, *, post_id: int) -> List[str]:
+        """Get tag names of a blog post."""
+        rows = await self.db.fetch_all(
+            query=GET_POST_TAGS_QUERY, values={"post_id": post_id}
+        )
+        return [row["name"] for row in rows]
+
+    async def get_blog_posts_by_tag(
+        self, *, tag: str, before: Optional[int] = None, limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """Get blog posts with a tag, newest first, older than post id `before`."""
+        blog_posts = await self.db.fetch_all(
+            query=GET_BLOG_POSTS_BY_TAG_QUERY,
+            values={
+                "tag": tag.strip().lower(),
+                "before": before or MAX_POST_ID,
+                "limit": limit,
+            },
+        )
+        return [inflate_row(blog_post) for blog_post in blog_posts]
+
+    async def get_recent_blog_posts(
+        self,
+        *,
+        before_created_at: Optional[datetime] = None,
+        before_post_id: Optional[int] = None,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """Get posts from the last RECENT_POSTS_MAX_AGE_DAYS, newest first.
+
+        Pass created_at and post_id of the last post received to get the next page.
+        """
+        now = datetime.now(timezone.utc)
+        blog_posts = await self.db.fetch_all(
+            query=GET_RECENT_BLOG_POSTS_QUERY,
+            values={
+                "since": now - timedelta(days=RECENT_POSTS_MAX_AGE_DAYS),
+                "before_created_at": before_created_at or now,
+                "before_post_id": before_post_id or MAX_POST_ID,
+                "limit": limit,
+            },
+        )
+        return [inflate_row(blog_post) for blog_post in blog_posts]
+
+    async def get_feed(
+        self, *, user_uuid: str, before: Optional[int] = None, limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """Get posts by authors the user follows, newest first."""
+        blog_posts = await self.db.fetch_all(
+            query=GET_FEED_QUERY,
+            values={
+                "user_uuid": user_uuid,
+                "before": before or MAX_POST_ID,
+                "limit": limit,
+                "max_followers": FANOUT_MAX_FOLLOWERS,
+            },
+        )
+        return [inflate_row(blog_post) for blog_post in blog_posts]
+
+    async def get_tag_counts(self, *, limit: int = 50) -> List[Record]:
+        """Get the most used tags and their post counts."""
+        return await self.db.fetch_all(
+            query=GET_TAG_COUNTS_QUERY, values={"limit": limit}
+        )
 
     async def get_blog_post(
         self, post_id: int
-    ) -> Union[BlogPostInDB, BlogPostPublic, None]:
+    ) -> Union[Dict[str, Any], None]:
         """Get blog post data."""
-        blog_post = await self.db.fetch_one(
-            query=GET_BLOG_POST_BY_POST_ID_QUERY,
+        blog_post = await self.fetch_one_coalesced(
+            name="GET_BLOG_POST_BY_POST_ID_QUERY",
+            query=GET_BLOG_POST_BY_POST_ID_PREPARED,
             values={"post_id": post_id},
         )
-        return blog_post
+        if blog_post is None:
+            return None
+        return inflate_row(blog_post)
 
     async def get_all_blog_post(
         self,
-    ) -> List[Union[BlogPostInDB, BlogPostPublic, None]]:
+    ) -> List[Dict[str, Any]]:
         """Get all blog posts"""
         blog_posts = await self.db.fetch_all(query=GET_ALL_BLOG_POSTS)
-        return blog_posts
+        return [inflate_row(blog_post) for blog_post in blog_posts]
 
     async def update_blog_posts(
-        self, blog_post_updated_params: UpdateBlogPost, post_id: int
+        self,
+        blog_post_updated_params: UpdateBlogPost,
+        post_id: int,
+        editor_username: Optional[str] = None,
     ) -> Union[BlogPostInDB, BlogPostPublic, None]:
-        """Update blog post via post id"""
+        """Update blog post via post id, recording the previous version."""
         new_blog_post_updated_params = blog_post_updated_params.copy(
             update={
                 "post_id": post_id,
             }
         )
-        updated_post = await self.db.fetch_one(
-            query=UPDATE_BLOG_POST_BY_POST_ID_QUERY,
-            values=new_blog_post_updated_params.dict(),
+        async with self.db.transaction():
+            locked_post = await self.db.fetch_one(
+                query=LOCK_BLOG_POST_FOR_UPDATE_QUERY, values={"post_id": post_id}
+            )
+            if locked_post is None:
+                return None
+            current_post = inflate_row(locked_post)
+            content, content_compressed = split_content(
+                blog_post_updated_params.content
+            )
+            # The row is locked above, so the update always returns it.
+            updated_post = inflate_row(
+                cast(
+                    Record,
+                    await self.db.fetch_one(
+                        query=UPDATE_BLOG_POST_BY_POST_ID_QUERY,
+                        values={
+                            **new_blog_post_updated_params.dict(exclude={"tags"}),
+                            "content": content,
+                            "content_compressed": content_compressed,
+                        },
+                    ),
+                )
+            )
+            await self.revisions_repo.record_revision(
+                post_id=post_id,
+                old_title=current_post["title"],
+                old_content=current_post["content"] or "",
+                old_editor_username=current_post["user_username"],
+                old_updated_at=current_post["updated_at"],
+                title=blog_post_updated_params.title,
+                content=blog_post_updated_params.content,
+                editor_username=editor_username or current_post["user_username"],
+            )
+            if blog_post_updated_params.tags is not None:
+                await self.set_post_tags(
+                    post_id=post_id, tags=blog_post_updated_params.tags
+                )
+            tags = await self.get_post_tags(post_id=post_id)
+            event = await self.notify_post_event(event="updated", post=updated_post)
+        self.publish_local_post_event(event)
+        return BlogPostInDB(
+            **updated_post, content=blog_post_updated_params.content, tags=tags
         )
-        return BlogPostInDB(**updated_post)
 
     async def delete_blog_post(self, *, post_id: int) -> int:
         """Delete blog post via post id."""
         try:
-            return await self.db.execute(
-                query=DELETE_BLOG_POST_BY_POST_ID_QUERY,
-                values={"post_id": post_id},
-            )
+            async with self.db.transaction():
+                deleted_post_id = await self.db.execute(
+                    query=DELETE_BLOG_POST_BY_POST_ID_QUERY,
+                    values={"post_id": post_id},
+                )
+                # Its timeline rows go with it, by trigger.
+                if deleted_post_id:
+                    event = await self.notify_post_event(
+                        event="deleted", post={"post_id": deleted_post_id}
+                    )
         except Exception as e:
             print(e)
             return None
+        if deleted_post_id:
+            self.publish_local_post_event(event)
+        return deleted_post_id
@@ -0,0 +1,155 @@
+"""DB repo for Blog Post revisions."""
+
+# Standard library imports
+from datetime import datetime
+from typing import List, Optional, Union
+
+# Third party imports
+from databases import Database
+from databases.interfaces import Record
+from starlette.concurrency import run_in_threadpool
+
+from src.core.config import REVISION_DELTA_MAX_CHARS, REVISION_SNAPSHOT_INTERVAL
+from src.db.repositories.base import BaseRepository
+from src.models.post_revision import PostRevisionPublic
+from src.services.revisions import apply_delta, make_delta
+
+GET_LATEST_REVISION_QUERY = """
+    SELECT revision
+    FROM post_revision
+    WHERE post_id = :post_id
+    ORDER BY revision DESC
+    LIMIT 1;
+"""
+
+# created_at is now() unless given, as for the original content's snapshot.
+CREATE_POST_REVISION_QUERY = """
+    INSERT INTO post_revision
+        (post_id, revision, is_snapshot, title, content_delta, editor_username, created_at)
+    VALUES (:post_id, :revision, :is_snapshot, :title, :content_delta, :editor_username,
+            COALESCE(CAST(:created_at AS TIMESTAMPTZ), now()));
+"""
+
+GET_POST_REVISIONS_QUERY = """
+    SELECT post_id, revision, title, is_snapshot, octet_length(content_delta) AS stored_size,
+           editor_username, created_at
+    FROM post_revision
+    WHERE post_id = :post_id
+    ORDER BY revision DESC;
+"""
+
+# The requested revision and the deltas back to its nearest snapshot.
+GET_POST_REVISION_CHAIN_QUERY = """
+    SELECT post_id, revision, is_snapshot, title, content_delta, editor_username, created_at
+    FROM post_revision
+    WHERE post_id = :post_id
+      AND revision <= :revision
+      AND revision >= (
+          SELECT max(revision) FROM post_revision
+          WHERE post_id = :post_id AND revision <= :revision AND is_snapshot
+      )
+    ORDER BY revision;
+"""
+
+
+class PostRevisionRepository(BaseRepository):
+    """All db actions associated with blog post revisions."""
+
+    def __init__(self, db: Database) -> None:
+        """Initialize db"""
+        super().__init__(db)
+
+    async def record_revision(
+        self,
+        *,
+        post_id: int,
+        old_title: str,
+        old_content: str,
+        old_editor_username: str,
+        old_updated_at: datetime,
+        title: str,
+        content: str,
+        editor_username: str,
+    ) -> int:
+        """Store an edit as a delta against the previous content.
+
+        Must run in the transaction that updates the post, with the post row
+        locked. Posts edited for the first time get their original content
+        stored as snapshot revision 1, dated when that content was last
+        written (old_updated_at). The delta is computed in the threadpool
+        so the event loop keeps serving while the row is locked, and large
+        edits are stored as snapshots so the lock is held for a bounded time.
+        """
+        latest = await self.db.fetch_one(
+            query=GET_LATEST_REVISION_QUERY, values={"post_id": post_id}
+        )
+        if latest is None:
+            await self._create_revision(
+                post_id=post_id,
+                revision=1,
+                is_snapshot=True,
+                title=old_title,
+                content_delta=old_content,
+                editor_username=old_editor_username,
+                created_at=old_updated_at,
+            )
+            revision = 2
+        else:
+            revision = latest["revision"] + 1
+
+        is_snapshot = (revision - 1) % REVISION_SNAPSHOT_INTERVAL == 0 or (
+            len(old_content) + len(content) > REVISION_DELTA_MAX_CHARS
+        )
+        if is_snapshot:
+            content_delta = content
+        else:
+            content_delta = await run_in_threadpool(make_delta, old_content, content)
+        await self._create_revision(
+            post_id=post_id,
+            revision=revision,
+            is_snapshot=is_snapshot,
+            title=title,
+            content_delta=content_delta,
+            editor_username=editor_username,
+        )
+        return revision
+
+    async def _create_revision(
+        self,
+        *,
+        created_at: Optional[datetime] = None,
+        **values: Union[int, bool, str],
+    ) -> None:
+        await self.db.execute(
+            query=CREATE_POST_REVISION_QUERY,
+            values={**values, "created_at": created_at},
+        )
+
+    async def get_post_revisions(self, *, post_id: int) -> List[Record]:
+        """List revisions of a post, newest first."""
+        return await self.db.fetch_all(
+            query=GET_POST_REVISIONS_QUERY, values={"post_id": post_id}
+        )
+
+    async def get_post_revision(
+        self, *, post_id: int, revision: int
+    ) -> Union[PostRevisionPublic, None]:
+        """Rebuild a revision from its nearest snapshot and following deltas."""
+        chain = await self.db.fetch_all(
+            query=GET_POST_REVISION_CHAIN_QUERY,
+            values={"post_id": post_id, "revision": revision},
+        )
+        if not chain or chain[-1]["revision"] != revision:
+            return None
+        content = chain[0]["content_delta"]
+        for row in chain[1:]:
+            content = apply_delta(content, row["content_delta"])
+        target = chain[-1]
+        return PostRevisionPublic(
+            post_id=post_id,
+            revision=revision,
+            title=target["title"],
+            content=content,
+            editor_username=target["editor_username"],
+            created_at=target["created_at"],
+        )
@@ -0,0 +1,120 @@
+"""DB repo for trending posts."""
+
+# Standard library imports
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+# Third party imports
+from databases import Database
+
+from src.core.config import (
+    TRENDING_EDIT_WEIGHT,
+    TRENDING_GRAVITY,
+    TRENDING_REFRESH_SECONDS,
+    TRENDING_SIZE,
+    TRENDING_WINDOW_HOURS,
+)
+from src.db.repositories.base import BaseRepository
+from src.models.trending import TrendingPostPublic
+
+FLUSH_POST_VIEWS_QUERY = """
+    INSERT INTO post_activity (post_id, view_count)
+    SELECT unnest(CAST(:post_ids AS integer[])), unnest(CAST(:view_counts AS bigint[]))
+    ON CONFLICT (post_id) DO UPDATE
+    SET view_count = post_activity.view_count + EXCLUDED.view_count, updated_at = now();
+"""
+
+# Only one worker refreshes at a time; the others keep their cached ranking.
+LOCK_TRENDING_REFRESH_QUERY = """
+    SELECT pg_try_advisory_xact_lock(hashtext('refresh_trending_posts'));
+"""
+
+GET_TRENDING_COMPUTED_AT_QUERY = """
+    SELECT max(computed_at) FROM trending_post;
+"""
+
+DELETE_TRENDING_POSTS_QUERY = """
+    DELETE FROM trending_post;
+"""
+
+# Activity (views, weighted recent edits) decayed by age in hours, over posts
+# inside the window only, so the cost follows recent posts, not all posts.
+REFRESH_TRENDING_POSTS_QUERY = """
+    INSERT INTO trending_post (rank, post_id, title, user_username, created_at, score)
+    SELECT row_number() OVER (ORDER BY score DESC, post_id DESC),
+           post_id, title, user_username, created_at, score
+    FROM (
+        SELECT blog_post.post_id, blog_post.title, blog_post.user_username,
+               blog_post.created_at,
+               (
+                   1 + COALESCE(post_activity.view_count, 0)
+                   + :edit_weight * (
+                       SELECT count(*) FROM post_revision
+                       WHERE post_revision.post_id = blog_post.post_id
+                         AND post_revision.created_at >= :since
+                   )
+               ) / power(
+                   extract(epoch FROM now() - blog_post.created_at) / 3600 + 2,
+                   :gravity
+               ) AS score
+        FROM blog_post
+        LEFT JOIN post_activity ON post_activity.post_id = blog_post.post_id
+        WHERE blog_post.created_at >= :since
+    ) AS scored
+    ORDER BY score DESC, post_id DESC
+    LIMIT :size;
+"""
+
+GET_TRENDING_POSTS_QUERY = """
+    SELECT rank, post_id, title, user_username, created_at, score
+    FROM trending_post
+    ORDER BY rank;
+"""
+
+
+class TrendingRepository(BaseRepository):
+    """All db actions associated with trending posts."""
+
+    def __init__(self, db: Database) -> None:
+        """Initialize db"""
+        super().__init__(db)
+
+    async def flush_post_views(self, *, view_counts: Dict[int, int]) -> None:
+        """Add view counts collected in memory to post_activity."""
+        if not view_counts:
+            return
+        await self.db.execute(
+            query=FLUSH_POST_VIEWS_QUERY,
+            values={
+                "post_ids": list(view_counts.keys()),
+                "view_counts": list(view_counts.values()),
+            },
+        )
+
+    async def refresh_trending_posts(self) -> bool:
+        """Recompute the ranking unless another worker just did."""
+        async with self.db.transaction():
+            if not await self.db.fetch_val(query=LOCK_TRENDING_REFRESH_QUERY):
+                return False
+            computed_at = await self.db.fetch_val(query=GET_TRENDING_COMPUTED_AT_QUERY)
+            now = datetime.now(timezone.utc)
+            if computed_at and now - computed_at < timedelta(
+                seconds=TRENDING_REFRESH_SECONDS / 2
+            ):
+                return False
+            await self.db.execute(query=DELETE_TRENDING_POSTS_QUERY)
+            await self.db.execute(
+                query=REFRESH_TRENDING_POSTS_QUERY,
+                values={
+                    "since": now - timedelta(hours=TRENDING_WINDOW_HOURS),
+                    "edit_weight": TRENDING_EDIT_WEIGHT,
+                    "gravity": TRENDING_GRAVITY,
+                    "size": TRENDING_SIZE,
+                },
+            )
+        return True
+
+    async def get_trending_posts(self) -> List[TrendingPostPublic]:
+        """Get the precomputed ranking."""
+        trending_posts = await self.db.fetch_all(query=GET_TRENDING_POSTS_QUERY)
+        return [TrendingPostPublic(**post._mapping) for post in trending_posts]
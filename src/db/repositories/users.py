@@ -4,11 +4,21 @@
 from typing import Union
 
 from databases import Database
+from databases.interfaces import Record
 from fastapi import HTTPException, status
 from pydantic import EmailStr
 
+from src.core.config import FANOUT_MAX_FOLLOWERS, FOLLOW_BACKFILL_POSTS
+from src.db.prepared import PreparedQuery
 from src.db.repositories.base import BaseRepository
-from src.models.users import CreateUser, UserInDB, UserPublic
+from src.models.users import (
+    AuthorPublic,
+    AuthorStats,
+    CreateUser,
+    UserInDB,
+    UserPrincipal,
+    UserPublic,
+)
 from src.services.auth import AuthService
 from src.utils.uuids import generate_uuid
 
@@ -33,10 +43,74 @@ GET_USER_BY_USERNAME_QUERY = """
 """
 
 GET_USER_BY_USER_UUID_QUERY = """
-    SELECT uuid, gid, first_name, other_names, nin, address, created_At, updated_At
+    SELECT uuid, first_name, last_name, username, email, created_at, updated_at
     FROM users
     WHERE uuid = :uuid;
-    """
+"""
+
+# Identity columns only; credentials are loaded on the login path.
+GET_PRINCIPAL_BY_USERNAME_QUERY = """
+    SELECT uuid, first_name, last_name, username, email, created_at, updated_at
+    FROM users
+    WHERE username = :username;
+"""
+
+# Hot lookups run as cached prepared statements.
+GET_USER_BY_USERNAME_PREPARED = PreparedQuery(GET_USER_BY_USERNAME_QUERY)
+GET_PRINCIPAL_BY_USERNAME_PREPARED = PreparedQuery(GET_PRINCIPAL_BY_USERNAME_QUERY)
+
+GET_AUTHOR_STATS_BY_USER_UUID_QUERY = """
+    SELECT post_count, last_post_at, follower_count
+    FROM author_stats
+    WHERE user_uuid = :user_uuid;
+"""
+
+GET_AUTHOR_BY_USERNAME_QUERY = """
+    SELECT users.username, users.first_name, users.last_name,
+           COALESCE(author_stats.post_count, 0) AS post_count,
+           author_stats.last_post_at,
+           COALESCE(author_stats.follower_count, 0) AS follower_count
+    FROM users
+    LEFT JOIN author_stats ON author_stats.user_uuid = users.uuid
+    WHERE users.username = :username;
+"""
+
+UPDATE_USER_PASSWORD_QUERY = """
+    UPDATE users
+    SET password = :password, salt = :salt
+    WHERE uuid = :uuid;
+"""
+
+FOLLOW_USER_QUERY = """
+    INSERT INTO follow (follower_uuid, followee_uuid)
+    VALUES (:follower_uuid, :followee_uuid)
+    ON CONFLICT DO NOTHING
+    RETURNING followee_uuid;
+"""
+
+# Seeds a new follower's timeline, unless the author is fanned out on read.
+BACKFILL_TIMELINE_ON_FOLLOW_QUERY = """
+    INSERT INTO timeline (user_uuid, post_id, author_uuid)
+    SELECT :follower_uuid, post_id, user_uuid
+    FROM blog_post
+    WHERE user_uuid = :followee_uuid
+      AND (SELECT follower_count FROM author_stats WHERE user_uuid = :followee_uuid)
+          <= :max_followers
+    ORDER BY post_id DESC
+    LIMIT :limit
+    ON CONFLICT DO NOTHING;
+"""
+
+UNFOLLOW_USER_QUERY = """
+    DELETE FROM follow
+    WHERE follower_uuid = :follower_uuid AND followee_uuid = :followee_uuid
+    RETURNING followee_uuid;
+"""
+
+REMOVE_AUTHOR_FROM_TIMELINE_QUERY = """
+    DELETE FROM timeline
+    WHERE user_uuid = :follower_uuid AND author_uuid = :followee_uuid;
+"""
 
 DELETE_USER_BY_USER_UUID_QUERY = """
     DELETE FROM users
@@ -68,9 +142,9 @@ class UserRepository(BaseRepository):
                 detail=f"{new_user.username} is already taken. Register a new username.",
             )
 
-        user_pwd_update = auth_service.create_salt_and_hashed_password(
+        user_pwd_update = auth_service.create_hashed_password(
             plaintext_pwd=new_user.password
-        )  # get hashed salt and hashed password.
+        )
 
         new_user_params = new_user.copy(
             update={
@@ -94,11 +168,19 @@ class UserRepository(BaseRepository):
 
         if not user:
             return None
-        if not auth_service.verify_password(pwd=password, salt=user.salt, hashed_pwd=user.password):  # type: ignore
+        verified, new_hash = auth_service.verify_and_update_password(
+            pwd=password, salt=user.salt, hashed_pwd=user.password  # type: ignore
+        )
+        if not verified:
             return None
+        if new_hash:
+            await self.db.execute(
+                query=UPDATE_USER_PASSWORD_QUERY,
+                values={"uuid": user.uuid, "password": new_hash, "salt": ""},  # type: ignore
+            )
         return user
 
-    async def get_user_by_uuid(self, uuid: str) -> Union[UserInDB, UserPublic, None]:
+    async def get_user_by_uuid(self, uuid: str) -> Union[Record, None]:
         """Get user data"""
         return await self.db.fetch_one(
             query=GET_USER_BY_USER_UUID_QUERY,
@@ -109,10 +191,28 @@ class UserRepository(BaseRepository):
         self, *, username: str
     ) -> Union[UserInDB, UserPublic, None]:
         """Get user by username."""
-        user_record = await self.db.fetch_one(
-            query=GET_USER_BY_USERNAME_QUERY, values={"username": username}
+        user_record = await self.fetch_one_coalesced(
+            name="GET_USER_BY_USERNAME_QUERY",
+            query=GET_USER_BY_USERNAME_PREPARED,
+            values={"username": username},
         )
-        return user_record
+        if user_record is None:
+            return None
+        # Rows from the users table are already valid.
+        return UserInDB.construct(**user_record)
+
+    async def get_principal_by_username(
+        self, *, username: str
+    ) -> Union[UserPrincipal, None]:
+        """Get identity columns of a user by username for authorization."""
+        principal = await self.fetch_one_coalesced(
+            name="GET_PRINCIPAL_BY_USERNAME_QUERY",
+            query=GET_PRINCIPAL_BY_USERNAME_PREPARED,
+            values={"username": username},
+        )
+        if principal is None:
+            return None
+        return UserPrincipal.construct(**principal)
 
     async def get_user_by_email(
         self, *, email: Union[EmailStr, str]
@@ -123,6 +223,57 @@ class UserRepository(BaseRepository):
         )
         return user_record
 
+    async def get_author_stats(self, *, user_uuid: str) -> AuthorStats:
+        """Get precomputed post stats for a user."""
+        stats = await self.db.fetch_one(
+            query=GET_AUTHOR_STATS_BY_USER_UUID_QUERY, values={"user_uuid": user_uuid}
+        )
+        if not stats:
+            return AuthorStats()
+        return AuthorStats(**stats._mapping)
+
+    async def get_author_by_username(
+        self, *, username: str
+    ) -> Union[AuthorPublic, None]:
+        """Get public author profile with post stats."""
+        author = await self.db.fetch_one(
+            query=GET_AUTHOR_BY_USERNAME_QUERY, values={"username": username}
+        )
+        if not author:
+            return None
+        return AuthorPublic(**author._mapping)
+
+    async def follow_user(self, *, follower_uuid: str, followee_uuid: str) -> bool:
+        """Follow an author. Returns False if already following."""
+        values = {"follower_uuid": follower_uuid, "followee_uuid": followee_uuid}
+        async with self.db.transaction():
+            followed = await self.db.fetch_one(query=FOLLOW_USER_QUERY, values=values)
+            if not followed:
+                return False
+            await self.db.execute(
+                query=BACKFILL_TIMELINE_ON_FOLLOW_QUERY,
+                values={
+                    **values,
+                    "max_followers": FANOUT_MAX_FOLLOWERS,
+                    "limit": FOLLOW_BACKFILL_POSTS,
+                },
+            )
+        return True
+
+    async def unfollow_user(self, *, follower_uuid: str, followee_uuid: str) -> bool:
+        """Unfollow an author. Returns False if not following."""
+        values = {"follower_uuid": follower_uuid, "followee_uuid": followee_uuid}
+        async with self.db.transaction():
+            unfollowed = await self.db.fetch_one(
+                query=UNFOLLOW_USER_QUERY, values=values
+            )
+            if not unfollowed:
+                return False
+            await self.db.execute(
+                query=REMOVE_AUTHOR_FROM_TIMELINE_QUERY, values=values
+            )
+        return True
+
     async def delete_user(self, *, uuid: str) -> str:
         """Delete user data by uuid."""
         return await self.db.execute(
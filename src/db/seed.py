@@ -0,0 +1,310 @@
+"""Generate a synthetic dataset of users and blog posts and bulk load it.
+
+Usage: python -m src.db.seed --users 100000 --posts 1000000 --seed 42
+
+Rows are loaded with COPY in batches instead of going through the API.
+Every user shares one bcrypt hash of --password, computed once, so users
+can log in without paying for a hash per row. The same seed, counts and
+--end date give the same rows, including post and tag ids: the seeder only
+runs on a database whose users, blog_post and tag tables are empty, and
+restarts their id sequences first.
+
+Users sign up during the --days before the posting window. Posts are then
+spread evenly over the --days up to --end, with post_id following
+created_at as it does in production. Posts per author are heavy-tailed and
+content length is log-normal; content above the compression threshold is
+stored compressed, as the API does. When blog_post is partitioned, the
+monthly partitions of the window are created before loading.
+"""
+
+# Standard library imports
+import argparse
+import asyncio
+import math
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate, islice
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+# Third party imports
+import asyncpg
+
+from src.core.config import BLOG_POST_PARTITION_MONTHS_AHEAD, DATABASE_URL
+from src.services.auth import pwd_context
+from src.services.compression import split_content
+
+USER_COLUMNS = [
+    "uuid",
+    "email",
+    "first_name",
+    "last_name",
+    "username",
+    "salt",
+    "password",
+    "created_at",
+    "updated_at",
+]
+BLOG_POST_COLUMNS = [
+    "post_id",
+    "title",
+    "content",
+    "content_compressed",
+    "user_uuid",
+    "user_username",
+    "created_at",
+    "updated_at",
+]
+
+# fmt: off
+FIRST_NAMES = [
+    "ada", "alan", "amara", "ama", "chen", "david", "elena", "fatima", "grace",
+    "hiro", "ifeoma", "james", "kofi", "lena", "maria", "nadia", "omar", "priya",
+    "quinn", "rahul", "sara", "tomas", "uma", "victor", "wei", "yaw", "zara",
+]
+LAST_NAMES = [
+    "adjei", "brown", "chowdhury", "diaz", "evans", "fischer", "garcia", "hopper",
+    "ito", "johnson", "kim", "lovelace", "mensah", "nguyen", "okafor", "patel",
+    "quartey", "rossi", "smith", "turing", "usman", "volkov", "wang", "yamamoto",
+]
+WORDS = [
+    "api", "async", "backend", "build", "cache", "cloud", "code", "data",
+    "database", "debug", "deploy", "design", "docker", "error", "fast", "feature",
+    "guide", "index", "latency", "learn", "linux", "model", "network", "notes",
+    "open", "performance", "postgres", "python", "query", "release", "review",
+    "schema", "scale", "security", "server", "service", "simple", "stack",
+    "startup", "system", "test", "tips", "tools", "tutorial", "update", "web",
+    "the", "a", "and", "of", "to", "in", "is", "for", "with", "on", "how", "why",
+]
+# fmt: on
+
+# Reserves a block of post ids so posts and their tags are written in one pass.
+RESERVE_POST_IDS_QUERY = """
+    SELECT setval('blog_post_post_id_seq', nextval('blog_post_post_id_seq') + $1 - 1)
+           - $1 + 1;
+"""
+
+# Rows already present would shift post and tag ids between runs.
+HAS_EXISTING_ROWS_QUERY = """
+    SELECT EXISTS (SELECT 1 FROM users)
+        OR EXISTS (SELECT 1 FROM blog_post)
+        OR EXISTS (SELECT 1 FROM tag);
+"""
+
+# Ids consumed by rows since deleted would shift them too.
+RESTART_ID_SEQUENCES_QUERY = """
+    SELECT setval('blog_post_post_id_seq', 1, false), setval('tag_tag_id_seq', 1, false);
+"""
+
+UPSERT_TAGS_QUERY = """
+    INSERT INTO tag (name) SELECT unnest($1::text[])
+    ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+    RETURNING tag_id, name;
+"""
+
+IS_BLOG_POST_PARTITIONED_QUERY = """
+    SELECT EXISTS (
+        SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('blog_post')
+    );
+"""
+
+CREATE_BLOG_POST_PARTITIONS_QUERY = """
+    SELECT create_blog_post_partitions('blog_post', $1, $2);
+"""
+
+
+def months_until(end: datetime) -> int:
+    """Whole months from the current month to the month of end."""
+    now = datetime.now(timezone.utc)
+    return (end.year - now.year) * 12 + end.month - now.month
+
+
+def batched(rows: Iterable, size: int) -> Iterator[List]:
+    """Split rows into lists of at most size."""
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def zipf_cum_weights(count: int, exponent: float = 1.1) -> List[float]:
+    """Cumulative weights making the first items the most frequent."""
+    return list(accumulate(1 / (rank + 1) ** exponent for rank in range(count)))
+
+
+def make_users(
+    rng: random.Random,
+    count: int,
+    password_hash: str,
+    signup_start: datetime,
+    days: int,
+) -> Iterator[Tuple]:
+    """User rows in USER_COLUMNS order."""
+    for i in range(count):
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        username = f"{first_name}.{last_name}.{i}"
+        created_at = signup_start + timedelta(seconds=rng.uniform(0, days * 86400))
+        yield (
+            str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            f"{username}@example.com",
+            first_name.capitalize(),
+            last_name.capitalize(),
+            username,
+            "",
+            password_hash,
+            created_at,
+            created_at,
+        )
+
+
+def make_posts(
+    rng: random.Random,
+    count: int,
+    first_post_id: int,
+    authors: Sequence[Tuple[str, str]],
+    tag_ids: Sequence[int],
+    window_start: datetime,
+    days: int,
+    median_chars: int,
+) -> Iterator[Tuple[Tuple, List[Tuple[int, int]]]]:
+    """(blog post row in BLOG_POST_COLUMNS order, post_tag rows) per post."""
+    corpus = " ".join(rng.choice(WORDS) for _ in range(200_000))
+    author_weights = list(accumulate(rng.paretovariate(1.2) for _ in authors))
+    tag_weights = zipf_cum_weights(len(tag_ids))
+    slot = days * 86400 / count
+    for i in range(count):
+        post_id = first_post_id + i
+        user_uuid, username = rng.choices(authors, cum_weights=author_weights)[0]
+        created_at = window_start + timedelta(seconds=slot * (i + rng.random()))
+        length = int(rng.lognormvariate(math.log(median_chars), 1.0))
+        length = min(max(length, 20), len(corpus) // 2)
+        start = rng.randrange(len(corpus) - length)
+        end = start + length
+        content, content_compressed = split_content(corpus[start:end])
+        title = " ".join(rng.choices(WORDS, k=rng.randint(3, 10))).capitalize()
+        tags = set()
+        if tag_ids:
+            k = rng.randint(0, 4)
+            tags = set(rng.choices(tag_ids, cum_weights=tag_weights, k=k))
+        yield (
+            (
+                post_id,
+                title,
+                content,
+                content_compressed,
+                user_uuid,
+                username,
+                created_at,
+                created_at,
+            ),
+            [(post_id, tag_id) for tag_id in sorted(tags)],
+        )
+
+
+async def seed(args: argparse.Namespace) -> None:
+    """Generate and load users, tags and posts."""
+    rng = random.Random(args.seed)
+    window_start = args.end - timedelta(days=args.days)
+    password_hash = pwd_context.hash(args.password)
+    connection = await asyncpg.connect(args.dsn)
+    try:
+        if await connection.fetchval(HAS_EXISTING_ROWS_QUERY):
+            raise SystemExit(
+                "users, blog_post or tag already has rows; "
+                "seed an empty database"
+            )
+        await connection.execute(RESTART_ID_SEQUENCES_QUERY)
+        if await connection.fetchval(IS_BLOG_POST_PARTITIONED_QUERY):
+            # No default partition: every month of the window needs its own.
+            await connection.execute(
+                CREATE_BLOG_POST_PARTITIONS_QUERY,
+                window_start,
+                max(BLOG_POST_PARTITION_MONTHS_AHEAD, months_until(args.end)),
+            )
+        authors: List[Tuple[str, str]] = []
+        users = make_users(
+            rng,
+            args.users,
+            password_hash,
+            window_start - timedelta(days=args.days),
+            args.days,
+        )
+        for batch in batched(users, args.batch_size):
+            await connection.copy_records_to_table(
+                "users", records=batch, columns=USER_COLUMNS
+            )
+            authors.extend((row[0], row[4]) for row in batch)
+            print(f"users: {len(authors)}/{args.users}")
+
+        tag_names = [f"{rng.choice(WORDS)}-{i}" for i in range(args.tags)]
+        tag_rows = await connection.fetch(UPSERT_TAGS_QUERY, tag_names)
+        tag_id_by_name = {row["name"]: row["tag_id"] for row in tag_rows}
+        tag_ids = [tag_id_by_name[name] for name in tag_names]
+
+        if args.posts and authors:
+            first_post_id = await connection.fetchval(
+                RESERVE_POST_IDS_QUERY, args.posts
+            )
+            posts = make_posts(
+                rng,
+                args.posts,
+                first_post_id,
+                authors,
+                tag_ids,
+                window_start,
+                args.days,
+                args.median_chars,
+            )
+            loaded = 0
+            for batch in batched(posts, args.batch_size):
+                async with connection.transaction():
+                    await connection.copy_records_to_table(
+                        "blog_post",
+                        records=[post for post, _ in batch],
+                        columns=BLOG_POST_COLUMNS,
+                    )
+                    post_tags = [row for _, rows in batch for row in rows]
+                    if post_tags:
+                        await connection.copy_records_to_table(
+                            "post_tag", records=post_tags, columns=["post_id", "tag_id"]
+                        )
+                loaded += len(batch)
+                print(f"blog posts: {loaded}/{args.posts}")
+
+        # Fresh statistics, so query plans match what the data looks like.
+        await connection.execute("ANALYZE users, blog_post, tag, post_tag")
+    finally:
+        await connection.close()
+    print(f"Seeded users can log in with password {args.password!r}")
+
+
+def main() -> None:
+    """Run the seeder from the command line."""
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        epilog="Requires empty users, blog_post and tag tables, so that post and "
+        "tag ids are the same on every run.",
+    )
+    parser.add_argument("--dsn", default=str(DATABASE_URL))
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--tags", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument(
+        "--end",
+        type=lambda value: datetime.fromisoformat(value).replace(tzinfo=timezone.utc),
+        default=datetime.now(timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        ),
+        help="ISO date the posting window ends on (default: today, UTC)",
+    )
+    parser.add_argument("--median-chars", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--password", default="seed-password")
+    args = parser.parse_args()
+    asyncio.run(seed(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,114 @@
 """Database Connect Tasks."""
 
+# Standard library imports
+import asyncio
+import logging
+from typing import Any, Dict, List, Tuple
+
 # Third party imports
 from databases import Database
 from fastapi import FastAPI
 
-from src.core.config import DATABASE_URL
+from src.core.config import (
+    BLOG_POST_PARTITION_MONTHS_AHEAD,
+    DATABASE_URL,
+    DB_MAX_POOL_SIZE,
+    DB_MIN_POOL_SIZE,
+    DB_STATEMENT_TIMEOUT_MS,
+    POST_EVENTS_BACKEND,
+)
+from src.db.deadlines import DeadlineDatabase
+from src.db.prepared import PreparedQuery
+from src.db.repositories.blog_post import GET_BLOG_POST_BY_POST_ID_PREPARED
+from src.db.repositories.trending import TrendingRepository
+from src.db.repositories.users import (
+    GET_PRINCIPAL_BY_USERNAME_PREPARED,
+    GET_USER_BY_USERNAME_PREPARED,
+)
+from src.services.post_events import post_events
+from src.services.trending import trending_cache, view_counter
+
+logger = logging.getLogger(__name__)
+
+IS_BLOG_POST_PARTITIONED_QUERY = """
+    SELECT EXISTS (
+        SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('blog_post')
+    );
+"""
+
+# Hot queries run on every pooled connection at startup with arguments that
+# match no rows, leaving them in each connection's statement cache.
+WARM_UP_QUERIES: List[Tuple[PreparedQuery, Dict[str, Any]]] = [
+    (GET_BLOG_POST_BY_POST_ID_PREPARED, {"post_id": -1}),
+    (GET_PRINCIPAL_BY_USERNAME_PREPARED, {"username": ""}),
+    (GET_USER_BY_USERNAME_PREPARED, {"username": ""}),
+]
 
 
 async def connect_to_db(app: FastAPI) -> None:
-    """Connect to postgres db."""
-    DB_URL = DATABASE_URL
-    database = Database(str(DB_URL))
+    """Connect to postgres db, opening the minimum pool.
+
+    Failures are raised so the worker never starts serving without a database.
+    """
+    database = DeadlineDatabase(
+        str(DATABASE_URL),
+        min_size=DB_MIN_POOL_SIZE,
+        max_size=DB_MAX_POOL_SIZE,
+        server_settings={"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)},
+    )
     try:
         print("Connecting to postgres database")
         await database.connect()
-        app.state._db = database
-        print("Connected to postgres database {DB_URL}")
     except Exception as e:
         print("Error connecting to postgres database", e)
+        raise
+    app.state._db = database
+    print(f"Connected to postgres database {database.url.database}")
+
+
+async def warm_up_db(app: FastAPI) -> None:
+    """Touch every pooled connection and prepare the hot statements on it."""
+    database: Database = app.state._db
+
+    async def touch() -> None:
+        # Separate connections so each one completes its setup now.
+        async with database.connection() as connection:
+            await connection.execute("SELECT 1")
+            for query, values in WARM_UP_QUERIES:
+                await connection.raw_connection.fetchrow(
+                    query.sql, *query.args(values)
+                )
+            await asyncio.sleep(0.05)
+
+    await asyncio.gather(*(touch() for _ in range(DB_MIN_POOL_SIZE)))
+
+
+async def is_blog_post_partitioned(app: FastAPI) -> bool:
+    """Whether the blog_post table in the database is partitioned."""
+    return await app.state._db.fetch_val(query=IS_BLOG_POST_PARTITIONED_QUERY)
+
+
+async def ensure_blog_post_partitions(app: FastAPI) -> None:
+    """Create monthly blog_post partitions ahead of time."""
+    created = await app.state._db.fetch_val(
+        query="SELECT create_blog_post_partitions('blog_post', now(), :months_ahead)",
+        values={"months_ahead": BLOG_POST_PARTITION_MONTHS_AHEAD},
+    )
+    if created:
+        print(f"Created {created} blog_post partitions")
+
+
+async def refresh_trending_posts(app: FastAPI) -> None:
+    """Flush view counts, recompute the ranking if due and reload it."""
+    trending_repo = TrendingRepository(app.state._db)
+    view_counts = view_counter.drain()
+    try:
+        await trending_repo.flush_post_views(view_counts=view_counts)
+    except Exception:
+        view_counter.restore(view_counts)
+        raise
+    await trending_repo.refresh_trending_posts()
+    trending_cache.replace(await trending_repo.get_trending_posts())
 
 
 async def close_db_connection(app: FastAPI) -> None:
@@ -26,3 +117,21 @@ async def close_db_connection(app: FastAPI) -> None:
         await app.state._db.disconnect()
     except Exception as e:
         print("Error disconnecting from postgres", e)
+
+
+async def start_post_events_listener() -> None:
+    """Open this worker's LISTEN connection for post events."""
+    if POST_EVENTS_BACKEND != "postgres":
+        return
+    try:
+        await post_events.listen(str(DATABASE_URL))
+    except Exception:
+        logger.exception("Error listening for post events, retrying in background")
+
+
+async def stop_post_events_listener() -> None:
+    """Close this worker's LISTEN connection for post events."""
+    try:
+        await post_events.close()
+    except Exception:
+        logger.exception("Error closing post events listener")
@@ -1,5 +1,9 @@
 """A model for the blog post"""
 
+from typing import List, Optional
+
+from pydantic import validator
+
 from src.models.core import CoreModel, DateTimeModelMixin, IDModelMixin
 
 
@@ -10,7 +14,21 @@ class BlogPostBase(CoreModel):
     content: str
 
 
-class CreateBlogPost(BlogPostBase):
+class TagsModelMixin(CoreModel):
+    """Tags assigned to a blog post."""
+
+    tags: Optional[List[str]]
+
+    @validator("tags")
+    def normalize_tags(cls, value: Optional[List[str]]) -> Optional[List[str]]:
+        """Lowercase, strip and dedupe tag names, keeping their order."""
+        if value is None:
+            return None
+        tags = (tag.strip().lower() for tag in value)
+        return list(dict.fromkeys(tag for tag in tags if tag))
+
+
+class CreateBlogPost(BlogPostBase, TagsModelMixin):
     """Blog Post Model used for creating a new Blog Post"""
 
     pass
@@ -19,10 +37,10 @@ class CreateBlogPost(BlogPostBase):
 class BlogPostPublic(BlogPostBase, DateTimeModelMixin, IDModelMixin):
     """Public Blog Post model"""
 
-    pass
+    tags: List[str] = []
 
 
-class UpdateBlogPost(BlogPostBase):
+class UpdateBlogPost(BlogPostBase, TagsModelMixin):
     pass
 
 
@@ -30,6 +48,7 @@ class BlogPostInDB(BlogPostBase, DateTimeModelMixin, IDModelMixin):
     """Blog Post Model in Database"""
 
     user_uuid: str
+    tags: List[str] = []
 
 
 class UpdateBlogPostInDB(BlogPostBase, IDModelMixin):
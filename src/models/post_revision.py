@@ -0,0 +1,29 @@
+"""A model for blog post revisions"""
+
+# Standard library imports
+from datetime import datetime
+
+from src.models.core import CoreModel
+
+
+class PostRevisionMeta(CoreModel):
+    """Revision listing entry"""
+
+    post_id: int
+    revision: int
+    title: str
+    is_snapshot: bool
+    stored_size: int
+    editor_username: str
+    created_at: datetime
+
+
+class PostRevisionPublic(CoreModel):
+    """Blog post as it was at a revision"""
+
+    post_id: int
+    revision: int
+    title: str
+    content: str
+    editor_username: str
+    created_at: datetime
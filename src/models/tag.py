@@ -0,0 +1,10 @@
+"""A model for blog post tags"""
+
+from src.models.core import CoreModel
+
+
+class TagPublic(CoreModel):
+    """Tag with the number of posts using it"""
+
+    name: str
+    post_count: int
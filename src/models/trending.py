@@ -0,0 +1,17 @@
+"""A model for trending blog posts"""
+
+# Standard library imports
+from datetime import datetime
+
+from src.models.core import CoreModel
+
+
+class TrendingPostPublic(CoreModel):
+    """Blog post in the precomputed trending ranking"""
+
+    rank: int
+    post_id: int
+    title: str
+    user_username: str
+    created_at: datetime
+    score: float
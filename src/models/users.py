@@ -1,5 +1,6 @@
 """A model for the user"""
 
+from datetime import datetime
 from typing import Annotated, Optional
 
 from pydantic import EmailStr, Field
@@ -24,10 +25,10 @@ class CreateUser(UserBase):
 
 
 class UserPasswordUpdate(CoreModel):
-    """Generated password and salt."""
+    """Generated password hash. salt is only set on legacy hashes."""
 
     password: Annotated[str, Field(min_length=7, max_length=80)]
-    salt: str
+    salt: str = ""
 
 
 class UserInDB(UserBase, DateTimeModelMixin):
@@ -38,7 +39,32 @@ class UserInDB(UserBase, DateTimeModelMixin):
     salt: str
 
 
+class UserPrincipal(UserBase, DateTimeModelMixin):
+    """Identity of the authenticated user, without credentials."""
+
+    uuid: str
+
+
+class AuthorStats(CoreModel):
+    """Precomputed post stats for an author."""
+
+    post_count: int = 0
+    last_post_at: Optional[datetime] = None
+    follower_count: int = 0
+
+
 class UserPublic(UserBase, DateTimeModelMixin):
     """Public user model"""
 
     access_token: Optional[AccessToken]
+    post_count: Optional[int]
+    last_post_at: Optional[datetime]
+    follower_count: Optional[int]
+
+
+class AuthorPublic(AuthorStats):
+    """Public author profile."""
+
+    username: str
+    first_name: str
+    last_name: str
@@ -2,20 +2,32 @@
 
 # Standard library imports
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Optional, Tuple, Union
 
 # Third party imports
-import bcrypt
 import jwt
 from fastapi import HTTPException, status
 from passlib.context import CryptContext
 from pydantic import ValidationError
 
-from src.core.config import ACCESS_TOKEN_EXPIRE_MINUTES, JWT_ALGORITHM, SECRET_KEY
+from src.core.config import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    BCRYPT_ROUNDS,
+    JWT_ALGORITHM,
+    SECRET_KEY,
+)
 from src.models.token import JWTCred, JWTMeta, JWTPayload
-from src.models.users import UserInDB, UserPasswordUpdate, UserPublic
+from src.models.users import UserInDB, UserPasswordUpdate, UserPrincipal, UserPublic
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min and max pinned to the configured cost so hashes made with any other cost
+# are reported by needs_update and rehashed on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 
 
 class AUthException(BaseException):
@@ -27,30 +39,32 @@ class AUthException(BaseException):
 class AuthService:
     """Authenticate class for all authentication."""
 
-    def create_salt_and_hashed_password(
-        self, *, plaintext_pwd: str
-    ) -> UserPasswordUpdate:
-        """Create salt and hashed password."""
-        salt = self.generate_salt()
-        hashed_password = self.hash_password(pwd=plaintext_pwd, salt=salt)
-        return UserPasswordUpdate(salt=salt, password=hashed_password)
+    def create_hashed_password(self, *, plaintext_pwd: str) -> UserPasswordUpdate:
+        """Create hashed password. bcrypt embeds its own salt in the hash."""
+        return UserPasswordUpdate(password=self.hash_password(pwd=plaintext_pwd))
 
-    def generate_salt(self) -> str:
-        """Generate salt."""
-        return bcrypt.gensalt().decode()
-
-    def hash_password(self, *, pwd: str, salt: str) -> str:
+    def hash_password(self, *, pwd: str) -> str:
         """Hash password."""
-        return pwd_context.hash(pwd + salt)
+        return pwd_context.hash(pwd)
 
     def verify_password(self, *, pwd: str, salt: str, hashed_pwd: str) -> bool:
-        """Verify password."""
+        """Verify password. A non-empty salt marks a legacy pwd + salt hash."""
         return pwd_context.verify(pwd + salt, hashed_pwd)
 
+    def verify_and_update_password(
+        self, *, pwd: str, salt: str, hashed_pwd: str
+    ) -> Tuple[bool, Optional[str]]:
+        """Verify password and return a new hash if the stored one is outdated."""
+        if salt:
+            if not pwd_context.verify(pwd + salt, hashed_pwd):
+                return False, None
+            return True, self.hash_password(pwd=pwd)
+        return pwd_context.verify_and_update(pwd, hashed_pwd)
+
     def create_access_token_for_user(
         self,
         *,
-        user: Union[UserPublic, UserInDB],
+        user: Union[UserPublic, UserInDB, UserPrincipal],
         secret_key: str = str(SECRET_KEY),
         expires_in: int = ACCESS_TOKEN_EXPIRE_MINUTES,
     ) -> Optional[Union[str, bytes]]:
@@ -0,0 +1,54 @@
+"""Pick a bcrypt cost factor for a target hash latency on this machine.
+
+Usage: python -m src.services.bcrypt_calibration --target-ms 250
+
+Set the printed value as BCRYPT_ROUNDS in .env. Existing hashes are
+rehashed to the new cost on each user's next successful login.
+"""
+
+# Standard library imports
+import argparse
+import time
+
+# Third party imports
+from passlib.hash import bcrypt
+
+MIN_ROUNDS = 4
+MAX_ROUNDS = 31
+
+
+def time_hash(rounds: int, samples: int = 3) -> float:
+    """Median milliseconds to hash a password at the given cost."""
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.using(rounds=rounds).hash("calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def calibrate(target_ms: float, samples: int = 3) -> int:
+    """Highest cost whose hash latency does not exceed target_ms."""
+    rounds = MIN_ROUNDS
+    elapsed = time_hash(rounds, samples)
+    print(f"rounds={rounds}: {elapsed:.1f}ms")
+    # Each extra round doubles the work, so stop before overshooting.
+    while rounds < MAX_ROUNDS and elapsed * 2 <= target_ms:
+        rounds += 1
+        elapsed = time_hash(rounds, samples)
+        print(f"rounds={rounds}: {elapsed:.1f}ms")
+    return rounds
+
+
+def main() -> None:
+    """Run calibration from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args()
+    rounds = calibrate(args.target_ms, args.samples)
+    print(f"BCRYPT_ROUNDS = {rounds}")
+
+
+if __name__ == "__main__":
+    main()
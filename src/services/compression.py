@@ -0,0 +1,53 @@
+"""Application-side compression of large blog post content."""
+
+# Standard library imports
+import zlib
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
+
+# Third party imports
+from databases.interfaces import Record
+
+from src.core.config import (
+    CONTENT_COMPRESSION_ENABLED,
+    CONTENT_COMPRESSION_LEVEL,
+    CONTENT_COMPRESSION_THRESHOLD_BYTES,
+)
+
+# First byte of every stored blob, so the codec can change without
+# rewriting existing rows.
+CODEC_ZLIB = b"\x01"
+
+
+def compress_content(content: str) -> bytes:
+    """Compress post content into a versioned blob."""
+    return CODEC_ZLIB + zlib.compress(content.encode(), CONTENT_COMPRESSION_LEVEL)
+
+
+def decompress_content(blob: bytes) -> str:
+    """Decompress a blob made by compress_content."""
+    codec, data = blob[:1], blob[1:]
+    if codec != CODEC_ZLIB:
+        raise ValueError(f"Unknown content codec {codec!r}")
+    return zlib.decompress(data).decode()
+
+
+def split_content(content: str) -> Tuple[Optional[str], Optional[bytes]]:
+    """Return (content, content_compressed) column values for storage."""
+    if not CONTENT_COMPRESSION_ENABLED:
+        return content, None
+    encoded = content.encode()
+    if len(encoded) < CONTENT_COMPRESSION_THRESHOLD_BYTES:
+        return content, None
+    blob = compress_content(content)
+    if len(blob) >= len(encoded):
+        return content, None
+    return None, blob
+
+
+def inflate_row(row: Union[Record, Mapping[str, Any]]) -> Dict[str, Any]:
+    """Row as a dict with content decompressed and the blob column dropped."""
+    post = dict(row._mapping if isinstance(row, Record) else row)
+    blob = post.pop("content_compressed", None)
+    if blob is not None:
+        post["content"] = decompress_content(blob)
+    return post
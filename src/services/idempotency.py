@@ -0,0 +1,103 @@
+"""Idempotency keys for write routes."""
+
+# Standard library imports
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# Third party imports
+from fastapi import HTTPException, status
+
+from src.core.config import (
+    IDEMPOTENCY_KEY_TTL_SECONDS,
+    IDEMPOTENCY_STORE_MAX_KEYS,
+    SECRET_KEY,
+)
+
+# (expires_at, payload fingerprint, handler task)
+Entry = Tuple[float, str, "asyncio.Task[Any]"]
+
+
+def fingerprint(payload: Dict[str, Any]) -> str:
+    """Keyed hash of a request payload, so payloads are never kept in memory."""
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hmac.new(str(SECRET_KEY).encode(), encoded, hashlib.sha256).hexdigest()
+
+
+class IdempotencyStore:
+    """Bounded in-process store of responses keyed by Idempotency-Key.
+
+    The first request for a key runs the handler in its own task; repeated
+    or concurrent requests with the same key and payload await that task and
+    get the stored result. The task outlives a cancelled request, so a
+    client disconnect neither fails the other waiters nor abandons the write.
+    Reusing a key with a different payload is rejected with 422. Failed
+    handlers are not stored so the client can retry.
+
+    Results are returned to anyone presenting the same key and payload, so
+    handlers must not return credentials; routes add those after the replay.
+    """
+
+    def __init__(self, *, ttl_seconds: int, max_keys: int) -> None:
+        """Initialize store limits."""
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max_keys
+        self._entries: "OrderedDict[Tuple[str, str], Entry]" = OrderedDict()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries and the oldest ones above max_keys."""
+        while self._entries:
+            expires_at, _, _ = next(iter(self._entries.values()))
+            if expires_at > now and len(self._entries) < self.max_keys:
+                break
+            self._entries.popitem(last=False)
+
+    def _forget_failed(
+        self, entry_key: Tuple[str, str], task: "asyncio.Task[Any]"
+    ) -> None:
+        """Drop the entry of a handler that raised or was cancelled."""
+        if not task.cancelled() and task.exception() is None:
+            return
+        entry = self._entries.get(entry_key)
+        if entry and entry[2] is task:
+            del self._entries[entry_key]
+
+    async def run(
+        self,
+        *,
+        key: Optional[str],
+        scope: str,
+        payload: Dict[str, Any],
+        handler: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Run handler once per (scope, key) within the ttl window."""
+        if not key:
+            return await handler()
+
+        now = time.monotonic()
+        self._evict(now)
+        entry_key = (scope, key)
+        request_fingerprint = fingerprint(payload)
+        entry = self._entries.get(entry_key)
+        if entry and entry[0] > now:
+            _, stored_fingerprint, task = entry
+            if not hmac.compare_digest(stored_fingerprint, request_fingerprint):
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Idempotency-Key was already used with a different request.",
+                )
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(handler())
+        self._entries[entry_key] = (now + self.ttl_seconds, request_fingerprint, task)
+        task.add_done_callback(lambda done: self._forget_failed(entry_key, done))
+        return await asyncio.shield(task)
+
+
+idempotency_store = IdempotencyStore(
+    ttl_seconds=IDEMPOTENCY_KEY_TTL_SECONDS, max_keys=IDEMPOTENCY_STORE_MAX_KEYS
+)
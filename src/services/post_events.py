@@ -0,0 +1,162 @@
+"""Broadcast blog post create, update and delete events to subscribers."""
+
+# Standard library imports
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Mapping, Optional, Set
+
+# Third party imports
+import asyncpg
+
+from src.core.config import POST_EVENTS_HEARTBEAT_SECONDS, POST_EVENTS_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+POST_EVENTS_CHANNEL = "blog_post_events"
+
+LISTEN_RETRY_MIN_SECONDS = 1.0
+LISTEN_RETRY_MAX_SECONDS = 30.0
+LISTEN_PROBE_TIMEOUT_SECONDS = 5.0
+
+
+def post_event_payload(*, event: str, post: Mapping[str, Any]) -> Dict[str, Any]:
+    """Small, bounded event payload; subscribers fetch the post if needed.
+
+    pg_notify payloads are limited to 8000 bytes, so no free text is sent.
+    """
+    updated_at = post.get("updated_at")
+    return {
+        "event": event,
+        "post_id": post["post_id"],
+        "updated_at": updated_at.isoformat() if updated_at else None,
+    }
+
+
+class PostEventBroadcaster:
+    """One broadcaster per worker, fanning events out to local subscribers.
+
+    With the postgres backend, a single LISTEN connection per worker feeds
+    every subscriber, so subscribers cost no queries. The connection is
+    probed every heartbeat and reopened with backoff when it drops (database
+    restart, failover); subscribers then get a "resync" event, since
+    notifications sent meanwhile are lost. Without it, events published in
+    this process are delivered directly (used in tests and single-worker
+    setups).
+    """
+
+    def __init__(self, *, queue_size: int, probe_seconds: float) -> None:
+        """Initialize subscriber queues."""
+        self.queue_size = queue_size
+        self.probe_seconds = probe_seconds
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._connection: Optional[asyncpg.Connection] = None
+        self._listener: Optional["asyncio.Task[None]"] = None
+
+    async def listen(self, database_url: str) -> None:
+        """Open the LISTEN connection, then keep it open in the background.
+
+        Raises if the first attempt fails; the background task retries.
+        """
+        try:
+            await self._connect(database_url)
+        finally:
+            self._listener = asyncio.create_task(
+                self._keep_listening(database_url), name="post_events_listener"
+            )
+
+    async def close(self) -> None:
+        """Stop reconnecting and close the LISTEN connection."""
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            await connection.close()
+
+    async def _connect(self, database_url: str) -> None:
+        connection = await asyncpg.connect(database_url)
+        try:
+            await connection.add_listener(POST_EVENTS_CHANNEL, self._on_notify)
+        except BaseException:
+            connection.terminate()
+            raise
+        self._connection = connection
+        logger.info("Listening for post events")
+
+    async def _is_alive(self) -> bool:
+        if self._connection is None or self._connection.is_closed():
+            return False
+        try:
+            await asyncio.wait_for(
+                self._connection.execute("SELECT 1"), LISTEN_PROBE_TIMEOUT_SECONDS
+            )
+        except (
+            asyncio.TimeoutError,
+            OSError,
+            asyncpg.PostgresError,
+            asyncpg.InterfaceError,
+        ):
+            return False
+        return True
+
+    async def _keep_listening(self, database_url: str) -> None:
+        """Probe the connection and reopen it with backoff when it is lost."""
+        delay = LISTEN_RETRY_MIN_SECONDS
+        while True:
+            await asyncio.sleep(self.probe_seconds if self._connection else delay)
+            if await self._is_alive():
+                continue
+            if self._connection is not None:
+                logger.warning("Post events listener connection lost, reconnecting")
+                connection, self._connection = self._connection, None
+                connection.terminate()
+            try:
+                await self._connect(database_url)
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as e:
+                delay = min(delay * 2, LISTEN_RETRY_MAX_SECONDS)
+                logger.warning(
+                    "Error reconnecting post events listener, retrying in %.0fs: %s",
+                    delay,
+                    e,
+                )
+                continue
+            delay = LISTEN_RETRY_MIN_SECONDS
+            self.publish({"event": "resync"})
+
+    def _on_notify(
+        self, connection: asyncpg.Connection, pid: int, channel: str, payload: str
+    ) -> None:
+        self.publish(json.loads(payload))
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Deliver an event to every local subscriber.
+
+        A subscriber that falls queue_size events behind loses its oldest
+        event rather than blocking everyone else.
+        """
+        for queue in list(self._subscribers):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[asyncio.Queue]:
+        """Queue receiving events for as long as the context is open."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of open subscriptions in this worker."""
+        return len(self._subscribers)
+
+
+post_events = PostEventBroadcaster(
+    queue_size=POST_EVENTS_QUEUE_SIZE, probe_seconds=POST_EVENTS_HEARTBEAT_SECONDS
+)
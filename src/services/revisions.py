@@ -0,0 +1,44 @@
+"""Line-based deltas between blog post revisions."""
+
+# Standard library imports
+import json
+from difflib import SequenceMatcher
+from typing import List, Union
+
+# A delta is a list of ops applied in order to the previous version's lines:
+#   [n]        copy the next n lines unchanged
+#   [-n]       skip the next n lines
+#   ["text"]   insert text (one or more whole lines)
+
+
+def make_delta(old: str, new: str) -> str:
+    """Encode new as a compact JSON delta against old."""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    ops: List[Union[int, str]] = []
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(i2 - i1)
+            continue
+        if i2 > i1:
+            ops.append(i1 - i2)
+        if j2 > j1:
+            ops.append("".join(new_lines[j1:j2]))
+    return json.dumps(ops, separators=(",", ":"), ensure_ascii=False)
+
+
+def apply_delta(old: str, delta: str) -> str:
+    """Rebuild the new version from old and a delta made by make_delta."""
+    old_lines = old.splitlines(keepends=True)
+    position = 0
+    parts: List[str] = []
+    for op in json.loads(delta):
+        if isinstance(op, str):
+            parts.append(op)
+        elif op >= 0:
+            parts.extend(old_lines[position:position + op])
+            position += op
+        else:
+            position -= op
+    return "".join(parts)
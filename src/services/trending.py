@@ -0,0 +1,47 @@
+"""In-process state for trending posts: pending views and the ranking."""
+
+# Standard library imports
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from src.models.trending import TrendingPostPublic
+
+
+class ViewCounter:
+    """Count post views in memory until the next flush to post_activity."""
+
+    def __init__(self) -> None:
+        """Initialize counts."""
+        self._counts: Counter = Counter()
+
+    def record(self, post_id: int) -> None:
+        """Count one view of a post."""
+        self._counts[post_id] += 1
+
+    def drain(self) -> Dict[int, int]:
+        """Return and reset the pending counts."""
+        counts, self._counts = self._counts, Counter()
+        return dict(counts)
+
+    def restore(self, counts: Dict[int, int]) -> None:
+        """Put back counts that could not be flushed."""
+        self._counts.update(counts)
+
+
+class TrendingCache:
+    """Latest trending ranking, served without touching the database."""
+
+    def __init__(self) -> None:
+        """Initialize an empty ranking."""
+        self.posts: List[TrendingPostPublic] = []
+        self.refreshed_at: Optional[datetime] = None
+
+    def replace(self, posts: List[TrendingPostPublic]) -> None:
+        """Swap in a new ranking."""
+        self.posts = posts
+        self.refreshed_at = datetime.utcnow()
+
+
+view_counter = ViewCounter()
+trending_cache = TrendingCache()